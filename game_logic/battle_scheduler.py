@@ -0,0 +1,95 @@
+from .combat_engine import COMBAT_END, CombatEngine, CombatEvent, FIRST, INITIATIVE, ROUND_END
+import heapq
+
+class AliveSet:
+    # characters in a list plus their positions, so removal (swap with the last) and random choice are O(1)
+    def __init__(self, characters=()):
+        self.items = []
+        self.positions = {}
+        for character in characters:
+            self.add(character)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, character):
+        return id(character) in self.positions
+
+    def add(self, character):
+        if id(character) not in self.positions:
+            self.positions[id(character)] = len(self.items)
+            self.items.append(character)
+
+    def remove(self, character):
+        position = self.positions.pop(id(character), None)
+        if position is None:
+            return
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self.positions[id(last)] = position
+
+class BattleScheduler(CombatEngine):
+    # CombatEngine's rules and rolls for battles of any size: turns come off a heap keyed by (round, initiative),
+    # each side keeps a live target set, and the dead drop out of the heap when their turn comes up.
+    # One-on-one it draws the same numbers in the same order as CombatEngine
+    def __init__(self, player, allies, enemies, rng=None):
+        super().__init__(player, allies, enemies, rng)
+        self.turns = []
+        # enemies always keep the player as a target, as CombatEngine does, and only lose allies as they fall
+        self.player_side = AliveSet([player] + [ally for ally in allies if ally.hp > 0])
+        self.enemy_side = AliveSet(enemy for enemy in enemies if enemy.hp > 0)
+
+    @property
+    def is_over(self):
+        return self.player.hp <= 0 or not self.enemy_side
+
+    @property
+    def player_won(self):
+        return self.player.hp > 0 and not self.enemy_side
+
+    def roll_initiative(self):
+        characters = self.allies + self.enemies + [self.player]
+        rolls = [self.rng.randint(1, 20) + character.ev for character in characters]
+        # ties keep the listing order, like CombatEngine's stable sort
+        self.turns = [(1, -roll, position, character) for position, (character, roll) in enumerate(zip(characters, rolls))]
+        heapq.heapify(self.turns)
+        self.order = [turn[3] for turn in sorted(self.turns, key=lambda turn: turn[:3])]
+        events = [CombatEvent(INITIATIVE, 0, character, None, roll) for character, roll in zip(characters, rolls)]
+        events.append(CombatEvent(FIRST, 0, self.order[0], None, None))
+        return events
+
+    def resolve_round(self):
+        if self.order is None:
+            self.roll_initiative()
+        events = []
+        turns = self.turns
+        round_number = self.rounds + 1
+        while turns and turns[0][0] == round_number:
+            turn = heapq.heappop(turns)
+            character = turn[3]
+            if character.hp <= 0:
+                # lazy removal: a fallen character's turn is simply not put back
+                continue
+            heapq.heappush(turns, (round_number + 1,) + turn[1:])
+            targets = self.player_side if character.is_enemy else self.enemy_side
+            if not targets:
+                continue
+            target = self.rng.choice(targets.items)
+            hit, damage, critical = self.attack(character, target, events, round_number)
+            if hit:
+                if target.hp <= 0 and target is not self.player:
+                    targets.remove(target)
+                if character.is_enemy:
+                    self.e_successful_attacks += 1
+                    self.e_successful_crits += critical
+                    self.e_total_damage += damage
+                else:
+                    self.p_successful_attacks += 1
+                    self.p_successful_crits += critical
+                    self.p_total_damage += damage
+        self.rounds = round_number
+        events.append(CombatEvent(ROUND_END, round_number, None, None, round_number))
+        if self.is_over:
+            events.append(CombatEvent(COMBAT_END, round_number, None, None, self.player_won))
+        return events
@@ -0,0 +1,132 @@
+from collections import namedtuple
+import random
+
+INITIATIVE, FIRST, ATTACK, MISS, HIT, BLOCK, DEFLECT, CRIT, DEATH, ROUND_END, COMBAT_END = (
+    "initiative", "first", "attack", "miss", "hit", "block", "deflect", "crit", "death", "round_end", "combat_end")
+
+# value is the initiative roll, the damage dealt, the round number or, for combat_end, True when the player's side won
+CombatEvent = namedtuple("CombatEvent", ["kind", "round", "actor", "target", "value"])
+
+class CombatEngine:
+    def __init__(self, player, allies, enemies, rng=None):
+        self.player = player
+        self.allies = allies
+        self.enemies = enemies
+        self.rng = rng or random
+        self.order = None
+        self.p_successful_crits = 0
+        self.p_successful_attacks = 0
+        self.p_total_damage = 0
+        self.e_successful_crits = 0
+        self.e_successful_attacks = 0
+        self.e_total_damage = 0
+        self.rounds = 0
+
+    @property
+    def is_over(self):
+        return self.player.hp <= 0 or all(enemy.hp <= 0 for enemy in self.enemies)
+
+    @property
+    def player_won(self):
+        return self.player.hp > 0 and all(enemy.hp <= 0 for enemy in self.enemies)
+
+    def roll_initiative(self):
+        characters = self.allies + self.enemies + [self.player]
+        # same roll as Character.roll_initiative, drawn from the engine's rng
+        rolls = {character: self.rng.randint(1, 20) + character.ev for character in characters}
+        self.order = sorted(characters, key=lambda character: rolls[character], reverse=True)
+        events = [CombatEvent(INITIATIVE, 0, character, None, roll) for character, roll in rolls.items()]
+        events.append(CombatEvent(FIRST, 0, self.order[0], None, None))
+        return events
+
+    def resolve_round(self):
+        if self.order is None:
+            self.roll_initiative()
+        events = []
+        round_number = self.rounds + 1
+        for character in self.order:
+            if character.hp <= 0:
+                continue
+            if character.is_enemy:
+                targets = [self.player] + [ally for ally in self.allies if ally.hp > 0]
+            else:
+                targets = [enemy for enemy in self.enemies if enemy.hp > 0]
+            if not targets:
+                continue
+            target = self.rng.choice(targets)
+            hit, damage, critical = self.attack(character, target, events, round_number)
+            if hit:
+                if character.is_enemy:
+                    self.e_successful_attacks += 1
+                    self.e_successful_crits += critical
+                    self.e_total_damage += damage
+                else:
+                    self.p_successful_attacks += 1
+                    self.p_successful_crits += critical
+                    self.p_total_damage += damage
+        self.rounds = round_number
+        events.append(CombatEvent(ROUND_END, round_number, None, None, round_number))
+        if self.is_over:
+            events.append(CombatEvent(COMBAT_END, round_number, None, None, self.player_won))
+        return events
+
+    def run(self, max_rounds=1000):
+        # headless fight to the finish; initiative events first, then every round's
+        events = self.roll_initiative() if self.order is None else []
+        while not self.is_over and self.rounds < max_rounds:
+            events.extend(self.resolve_round())
+        return events
+
+    def calculate_hit_rate(self, attacker_accuracy, defender_evasion):
+        hit_chance = min(1, max(0.1, attacker_accuracy / (attacker_accuracy + defender_evasion)))
+        hit_chance *= self.rng.uniform(0.85, 1.15)
+        return int(hit_chance * 100)
+
+    def attack(self, attacker, target, events, round_number=0):
+        rng = self.rng
+        events.append(CombatEvent(ATTACK, round_number, attacker, target, None))
+        hit_rate = self.calculate_hit_rate(attacker.acc, target.ev)
+        if rng.randint(1, 100) > hit_rate:
+            events.append(CombatEvent(MISS, round_number, attacker, target, 0))
+            return False, 0, False
+        damage = attacker.atk - int(rng.uniform(0.75, 1.1) * 0.5 * target.defp)
+        block_chance = (target.defp * 2) / 100
+        deflect_chance = target.defp / 100
+        block = rng.random() <= block_chance
+        deflect = rng.random() <= deflect_chance
+        adjusted_defp = round(target.defp * rng.uniform(0.7, 1.3))
+        if deflect:
+            damage = int(damage * 0.25)
+            events.append(CombatEvent(DEFLECT, round_number, attacker, target, damage))
+        elif block:
+            damage = int(damage * 0.5)
+            events.append(CombatEvent(BLOCK, round_number, attacker, target, damage))
+        damage -= int(adjusted_defp * 0.5)
+        critical = rng.randint(1, 100) <= 2.5
+        if critical:
+            damage = int(damage * rng.uniform(1.5, 3))
+        damage = int(max(damage, rng.randint(1, 3)))
+        was_alive = target.hp > 0
+        target.hp -= damage
+        events.append(CombatEvent(CRIT if critical else HIT, round_number, attacker, target, damage))
+        if was_alive and target.hp <= 0:
+            events.append(CombatEvent(DEATH, round_number, target, attacker, None))
+        return True, damage, critical
+
+def describe(events):
+    # the combat log text the Qt window has always shown, rebuilt from events
+    text = ""
+    for event in events:
+        if event.kind == INITIATIVE:
+            text += f"{event.actor.name} rolls {event.value}, "
+        elif event.kind == FIRST:
+            text += f"{event.actor.name} goes first.\n"
+        elif event.kind == CRIT:
+            text += f"{event.actor.name} attacks {event.target.name} gets a critical hit, dealing {event.value} damage!\n"
+        elif event.kind == HIT:
+            text += f"{event.actor.name} attacks {event.target.name} and hits for {event.value} damage.\n"
+        elif event.kind == MISS:
+            text += f"{event.actor.name} attacks {event.target.name} but misses.\n"
+        elif event.kind == ROUND_END:
+            text += "\n"
+    return text
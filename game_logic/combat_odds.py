@@ -0,0 +1,124 @@
+from collections import namedtuple
+from functools import lru_cache
+import math
+import numpy as np
+
+# expected_hp_loss is averaged over the fights the player wins; None when the player cannot win
+FightOdds = namedtuple("FightOdds", ["win_probability", "expected_hp_loss"])
+
+def floor_uniform(low, high):
+    # distribution of int(u) for u uniform on [low, high], low >= 0
+    if high <= low:
+        return {math.floor(low): 1.0}
+    width = high - low
+    return {k: (min(high, k + 1) - max(low, k)) / width for k in range(math.floor(low), math.floor(high) + 1) if min(high, k + 1) > max(low, k)}
+
+def round_uniform(low, high):
+    # distribution of round(u) for u uniform on [low, high]; exact halves have no mass
+    if high <= low:
+        return {round(low): 1.0}
+    width = high - low
+    return {m: (min(high, m + 0.5) - max(low, m - 0.5)) / width for m in range(round(low) - 1, round(high) + 2) if min(high, m + 0.5) > max(low, m - 0.5)}
+
+def truncated_scale(value, low, high):
+    # distribution of int(value * u) for u uniform on [low, high]; int() truncates toward zero
+    if value >= 0:
+        return floor_uniform(value * low, value * high)
+    return {-k: p for k, p in floor_uniform(-value * low, -value * high).items()}
+
+def add(distribution, value, probability):
+    distribution[value] = distribution.get(value, 0.0) + probability
+
+@lru_cache(maxsize=4096)
+def damage_distribution(atk, acc, defp, ev):
+    # exact outcome of CombatEngine.attack as a vector: index 0 is a miss, index d is d damage dealt
+    hit_chance = min(1, max(0.1, acc / (acc + ev)))
+    hit = sum(p * min(max(rate, 0), 100) / 100 for rate, p in floor_uniform(hit_chance * 85, hit_chance * 115).items())
+    deflect = min(max(defp / 100, 0), 1)
+    block = min(max(defp * 2 / 100, 0), 1)
+    guarded = {}
+    for reduction, p_reduction in floor_uniform(0.75 * 0.5 * defp, 1.1 * 0.5 * defp).items():
+        base = atk - reduction
+        add(guarded, int(base * 0.25), p_reduction * deflect)
+        add(guarded, int(base * 0.5), p_reduction * (1 - deflect) * block)
+        add(guarded, base, p_reduction * (1 - deflect) * (1 - block))
+    armored = {}
+    for adjusted_defp, p_adjusted in round_uniform(defp * 0.7, defp * 1.3).items():
+        for damage, p_damage in guarded.items():
+            add(armored, damage - int(adjusted_defp * 0.5), p_adjusted * p_damage)
+    dealt = {}
+    for damage, p_damage in armored.items():
+        add(dealt, damage, p_damage * 0.98)
+        for critical, p_critical in truncated_scale(damage, 1.5, 3).items():
+            add(dealt, critical, p_damage * 0.02 * p_critical)
+    # whatever the armor leaves, a hit still deals randint(1, 3)
+    final = {}
+    for damage, p_damage in dealt.items():
+        for minimum in (1, 2, 3):
+            add(final, max(damage, minimum), p_damage / 3)
+    vector = np.zeros(max(final) + 1)
+    for damage, p_damage in final.items():
+        vector[damage] += p_damage * hit
+    vector[0] = 1 - hit
+    return vector
+
+def player_first_probability(player_ev, enemy_ev):
+    # both roll randint(1, 20) + ev; CombatEngine's stable sort puts the enemy first on a tie
+    return sum(1 for player_roll in range(1, 21) for enemy_roll in range(1, 21) if player_roll + player_ev > enemy_roll + enemy_ev) / 400
+
+def solve_rounds(first, second, first_axis, player_hp, enemy_hp, pad, player_first):
+    # every round the first mover strikes along first_axis, then, if the target still stands, the second strikes back.
+    # before[.., ph, eh] holds (P(win), E[final HP; win]) at the start of a round, between[..] after the first strike;
+    # index i on either HP axis stands for HP i - pad, so the padding holds the finished fights
+    shape = (2, player_hp + pad + 1, enemy_hp + pad + 1)
+    before = np.zeros(shape)
+    between = np.zeros(shape)
+    won = between if player_first else before
+    alive_hp = np.arange(1, player_hp + 1)
+    won[0, pad + 1:, :pad + 1] = 1
+    won[1, pad + 1:, :pad + 1] = alive_hp[:, None]
+    first_hits, second_hits = np.arange(1, len(first)), np.arange(1, len(second))
+    for total in range(2, player_hp + enemy_hp + 1):
+        ph = np.arange(max(1, total - enemy_hp), min(player_hp, total - 1) + 1)
+        eh = total - ph
+        cells = (slice(None), ph + pad, eh + pad)
+        # one gather per diagonal: every damage a strike can deal, for every cell at once; all land on earlier diagonals
+        from_between = between[shifted(ph, eh, pad, first_axis, first_hits)] @ first[1:]
+        from_before = before[shifted(ph, eh, pad, 1 - first_axis, second_hits)] @ second[1:]
+        # both sides missing leaves the state unchanged, so the self-loop is solved in closed form
+        before[cells] = (first[0] * from_before + from_between) / (1 - first[0] * second[0])
+        between[cells] = second[0] * before[cells] + from_before
+    return before[:, player_hp + pad, enemy_hp + pad]
+
+def shifted(ph, eh, pad, axis, damage):
+    ph, eh = ph[:, None] + pad, eh[:, None] + pad
+    if axis == 0:
+        return slice(None), ph - damage, eh
+    return slice(None), ph, eh - damage
+
+@lru_cache(maxsize=1024)
+def fight_odds(player_stats, enemy_stats):
+    # stats are (hp, atk, defp, acc, ev) tuples; exact over every roll of a one-on-one CombatEngine fight
+    player_hp, player_atk, player_defp, player_acc, player_ev = player_stats
+    enemy_hp, enemy_atk, enemy_defp, enemy_acc, enemy_ev = enemy_stats
+    if player_hp <= 0:
+        return FightOdds(0.0, None)
+    if enemy_hp <= 0:
+        return FightOdds(1.0, 0.0)
+    player_damage = damage_distribution(player_atk, player_acc, enemy_defp, enemy_ev)
+    enemy_damage = damage_distribution(enemy_atk, enemy_acc, player_defp, player_ev)
+    pad = max(len(player_damage), len(enemy_damage))
+    player_first = player_first_probability(player_ev, enemy_ev)
+    outcome = player_first * solve_rounds(player_damage, enemy_damage, 1, player_hp, enemy_hp, pad, True)
+    outcome += (1 - player_first) * solve_rounds(enemy_damage, player_damage, 0, player_hp, enemy_hp, pad, False)
+    win_probability, final_hp = outcome.tolist()
+    if win_probability <= 0:
+        return FightOdds(0.0, None)
+    # the two initiative orders are summed in floating point, which can overshoot 1 by a few ulps
+    return FightOdds(min(win_probability, 1.0), player_hp - final_hp / win_probability)
+
+def stat_tuple(character):
+    return character.hp, character.atk, character.defp, character.acc, character.ev
+
+def odds_against(player, enemy):
+    return fight_odds(stat_tuple(player), stat_tuple(enemy))
@@ -0,0 +1,129 @@
+from collections import deque, namedtuple
+from .combat_engine import ATTACK, BLOCK, COMBAT_END, CRIT, CombatEvent, DEATH, DEFLECT, FIRST, HIT, INITIATIVE, MISS, ROUND_END, describe
+import os
+import struct
+
+MAGIC = b"2DTC"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ")
+COMBATANT = struct.Struct("<iiiiiBH")
+RECORD = struct.Struct("<IHBBBxi")
+KINDS = (INITIATIVE, FIRST, ATTACK, MISS, HIT, BLOCK, DEFLECT, CRIT, DEATH, ROUND_END, COMBAT_END)
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+NOBODY = 255
+
+Combatant = namedtuple("Combatant", ["name", "hp", "atk", "defp", "acc", "ev", "is_enemy"])
+RecordedEvent = namedtuple("RecordedEvent", ["sequence", "round", "kind", "actor", "target", "value"])
+
+class CombatRecorder:
+    # a fixed-size ring of events; once full, the oldest are overwritten. Recording is a deque append per event,
+    # the packing into binary records happens only when the ring is flushed
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.ring = deque(maxlen=capacity)
+        self.count = 0
+        self.roster = []
+        self.roster_ids = {}
+
+    def combatant_id(self, character):
+        combatant_id = self.roster_ids.get(id(character))
+        if combatant_id is None:
+            if len(self.roster) >= NOBODY:
+                raise ValueError(f"A recording holds at most {NOBODY} combatants")
+            combatant_id = len(self.roster)
+            self.roster_ids[id(character)] = combatant_id
+            # stats as they stood when the character first appeared, so a replay can start from them
+            self.roster.append((character, Combatant(character.name, character.hp, character.atk, character.defp, character.acc, character.ev, bool(character.is_enemy))))
+        return combatant_id
+
+    def begin(self, characters):
+        # registers everyone before the first blow so the roster holds their starting stats
+        for character in characters:
+            self.combatant_id(character)
+
+    def record(self, event):
+        self.ring.append(event)
+        self.count += 1
+
+    def record_all(self, events):
+        self.ring.extend(events)
+        self.count += len(events)
+
+    @property
+    def dropped(self):
+        return self.count - len(self.ring)
+
+    def records(self):
+        combatant_id = self.combatant_id
+        for sequence, (kind, round_number, actor, target, value) in enumerate(self.ring, self.dropped):
+            yield RECORD.pack(sequence, round_number, KIND_CODES[kind], NOBODY if actor is None else combatant_id(actor),
+                              NOBODY if target is None else combatant_id(target), int(value or 0))
+
+    def flush(self, path):
+        # records are packed first: a combatant first seen in them still has to make it into the roster
+        records = b"".join(self.records())
+        parts = [HEADER.pack(MAGIC, VERSION, len(self.roster), len(self.ring), self.dropped)]
+        for _, combatant in self.roster:
+            name = combatant.name.encode("utf-8")
+            parts.append(COMBATANT.pack(combatant.hp, combatant.atk, combatant.defp, combatant.acc, combatant.ev, combatant.is_enemy, len(name)))
+            parts.append(name)
+        parts.append(records)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(b"".join(parts))
+        os.replace(temp_path, path)
+
+class RecordedFight:
+    def __init__(self, roster, events, dropped):
+        self.roster = roster
+        self.events = events
+        self.dropped = dropped
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, combatant_count, record_count, dropped = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a combat recording of version {VERSION}")
+        offset = HEADER.size
+        roster = []
+        for _ in range(combatant_count):
+            hp, atk, defp, acc, ev, is_enemy, name_length = COMBATANT.unpack_from(data, offset)
+            offset += COMBATANT.size
+            roster.append(Combatant(data[offset:offset + name_length].decode("utf-8"), hp, atk, defp, acc, ev, bool(is_enemy)))
+            offset += name_length
+        events = []
+        for sequence, round_number, kind, actor, target, value in RECORD.iter_unpack(data[offset:offset + record_count * RECORD.size]):
+            events.append(RecordedEvent(sequence, round_number, KINDS[kind], roster[actor] if actor != NOBODY else None,
+                                        roster[target] if target != NOBODY else None, value))
+        return cls(roster, events, dropped)
+
+    def rounds(self):
+        # events grouped turn by turn: the initiative block first, then one list per round
+        grouped = {}
+        for event in self.events:
+            grouped.setdefault(event.round, []).append(event)
+        return [grouped[round_number] for round_number in sorted(grouped)]
+
+    def replay(self):
+        # rebuilds every combatant's HP from the starting roster and the recorded damage, round by round;
+        # once the ring has overwritten early damage the totals are unknown and HP comes back as None
+        hp = {index: combatant.hp for index, combatant in enumerate(self.roster)}
+        index_of = {id(combatant): index for index, combatant in enumerate(self.roster)}
+        for events in self.rounds():
+            for event in events:
+                if event.kind in (HIT, CRIT):
+                    hp[index_of[id(event.target)]] -= event.value
+            yield events, None if self.dropped else {self.roster[index].name: value for index, value in hp.items()}
+
+    def to_text(self):
+        lines = []
+        if self.dropped:
+            lines.append(f"({self.dropped} earlier events were overwritten in the ring buffer)")
+        for events, hp in self.replay():
+            as_events = [CombatEvent(event.kind, event.round, event.actor, event.target, event.value) for event in events]
+            lines.append(describe(as_events).rstrip("\n"))
+            if hp is not None:
+                lines.append("    HP: " + ", ".join(f"{name} {value}" for name, value in hp.items()))
+        return "\n".join(lines)
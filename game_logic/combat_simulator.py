@@ -0,0 +1,87 @@
+import numpy as np
+
+STATS = ("hp", "atk", "defp", "acc", "ev")
+
+def stats_of(characters):
+    return {stat: np.array([getattr(character, stat) for character in characters]) for stat in STATS}
+
+class SimulationResult:
+    def __init__(self, attacker_won, rounds, attacker_hp, defender_hp, finished):
+        self.attacker_won = attacker_won
+        self.rounds = rounds
+        self.attacker_hp = attacker_hp
+        self.defender_hp = defender_hp
+        self.finished = finished
+
+    @property
+    def win_rate(self):
+        return float(self.attacker_won.mean()) if len(self.attacker_won) else 0.0
+
+    def round_distribution(self):
+        return np.bincount(self.rounds)
+
+    def hp_percentiles(self, percentiles=(5, 25, 50, 75, 95)):
+        return {
+            "attacker": dict(zip(percentiles, np.percentile(self.attacker_hp, percentiles).tolist())),
+            "defender": dict(zip(percentiles, np.percentile(self.defender_hp, percentiles).tolist())),
+        }
+
+    def summary(self):
+        winners = self.attacker_hp[self.attacker_won]
+        return (f"{len(self.rounds)} fights, attacker wins {self.win_rate:.1%}, rounds p50 {np.percentile(self.rounds, 50):.0f} "
+                f"p95 {np.percentile(self.rounds, 95):.0f}, winner HP left p50 {np.percentile(winners, 50) if len(winners) else 0:.0f}, "
+                f"{int((~self.finished).sum())} unfinished")
+
+class CombatSimulator:
+    # one attacker against one defender per fight, every fight advanced in lockstep; the rolls follow CombatEngine.attack
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def attack(self, attacker, defender, index):
+        # damage dealt by attacker[index] to defender[index]; a miss deals 0
+        rng = self.rng
+        n = len(index)
+        acc = attacker["acc"][index]
+        ev = defender["ev"][index]
+        defp = defender["defp"][index]
+        hit_chance = np.clip(acc / (acc + ev), 0.1, 1) * rng.uniform(0.85, 1.15, n)
+        hit = rng.integers(1, 101, n) <= np.trunc(hit_chance * 100)
+        damage = attacker["atk"][index] - np.trunc(rng.uniform(0.75, 1.1, n) * 0.5 * defp)
+        block = rng.random(n) <= defp * 2 / 100
+        deflect = rng.random(n) <= defp / 100
+        # np.rint rounds half to even, exactly like the built-in round()
+        adjusted_defp = np.rint(defp * rng.uniform(0.7, 1.3, n))
+        damage = np.where(deflect, np.trunc(damage * 0.25), np.where(block, np.trunc(damage * 0.5), damage))
+        damage -= np.trunc(adjusted_defp * 0.5)
+        # randint(1, 100) <= 2.5 passes on 1 or 2 only
+        critical = rng.integers(1, 101, n) <= 2.5
+        damage = np.where(critical, np.trunc(damage * rng.uniform(1.5, 3, n)), damage)
+        damage = np.maximum(damage, rng.integers(1, 4, n))
+        return np.where(hit, damage, 0).astype(np.int64)
+
+    def simulate(self, attacker, defender, fights=None, max_rounds=1000):
+        # attacker and defender map each of STATS to a scalar or an array; everything broadcasts to `fights`
+        size = fights or max(np.size(value) for value in list(attacker.values()) + list(defender.values()))
+        attacker = {stat: np.broadcast_to(np.asarray(attacker[stat], dtype=np.float64), (size,)) for stat in STATS}
+        defender = {stat: np.broadcast_to(np.asarray(defender[stat], dtype=np.float64), (size,)) for stat in STATS}
+        rng = self.rng
+        attacker_hp = attacker["hp"].astype(np.int64)
+        defender_hp = defender["hp"].astype(np.int64)
+        attacker_roll = rng.integers(1, 21, size) + attacker["ev"]
+        defender_roll = rng.integers(1, 21, size) + defender["ev"]
+        # the sort in CombatEngine is stable and lists enemies before the player, so ties go to the defender
+        attacker_first = attacker_roll > defender_roll
+        rounds = np.zeros(size, dtype=np.int64)
+        active = (attacker_hp > 0) & (defender_hp > 0)
+        while active.any() and rounds.max(initial=0) < max_rounds:
+            # both sides move once per round: first whoever won initiative, then the other
+            for attacker_moves in (attacker_first, ~attacker_first):
+                # a side only swings while standing; the player also needs a living target, enemies swing regardless
+                attacking = np.flatnonzero(active & attacker_moves & (attacker_hp > 0) & (defender_hp > 0))
+                defender_hp[attacking] -= self.attack(attacker, defender, attacking)
+                defending = np.flatnonzero(active & ~attacker_moves & (defender_hp > 0))
+                attacker_hp[defending] -= self.attack(defender, attacker, defending)
+            rounds += active
+            active = active & (attacker_hp > 0) & (defender_hp > 0)
+        finished = (attacker_hp <= 0) | (defender_hp <= 0)
+        return SimulationResult((attacker_hp > 0) & (defender_hp <= 0), rounds, attacker_hp, defender_hp, finished)
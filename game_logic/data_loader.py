@@ -1,4 +1,11 @@
 from game_logic.game_logic import GameMap
+from game_logic.genre_cache import GenreCache, LazyGenres
+from game_logic.map_cache import MapCache
+from game_logic.map_pool import MapPool, SpeculativeGenerator
+from game_logic.open_world import OpenWorld
+from game_logic.room_grid import RoomGrid
+from game_logic.save_format import SaveFile, save_game
+from game_logic.stat_tables import GenreStats
 import json
 import logging
 import os
@@ -6,13 +13,19 @@ import random
 import sys
 
 class DataLoader:
-    def __init__(self, json_path):
+    def __init__(self, json_path, map_cache_dir=None):
         self.json_path = json_path
+        self.map_cache = MapCache(map_cache_dir) if map_cache_dir else None
+        self.map_pool = None
+        self.speculative_generator = None
         self.data = None
+        self.genre_cache = None
+        self.genre_stats = {}
         self.genre = None
         self.game_map = None
         self.treasure = None
         self.title = None
+        self.generation_attempts = 0
         self.load_data()
 
     def resource_path(self, relative_path):
@@ -35,31 +48,155 @@ class DataLoader:
             if not genres:
                 raise ValueError("Genres not found in data")
             self.genre = random.choice(genres)
+            self.stat_tables()
             logging.debug(f"Select_random_genre: Data keys after loading: {self.data.keys()}")
             logging.debug(f"Data length after loading: {len(self.data)}")
         except ValueError as e:
             logging.error(f"Error in selecting random genre: {str(e)}")
 
+    def genre_names(self):
+        if self.genre_cache:
+            return list(self.genre_cache.names)
+        return [genre["genre"] for genre in self.data.get("genres", [])]
+
+    def select_genre(self, genre_name):
+        if self.genre_cache:
+            if genre_name not in self.genre_cache.index:
+                raise ValueError(f"Genre {genre_name} not found in data")
+            self.genre = self.genre_cache.genre(genre_name)
+            self.stat_tables()
+            return self.genre
+        for genre in self.data.get("genres", []):
+            if genre["genre"] == genre_name:
+                self.genre = genre
+                self.stat_tables()
+                return genre
+        raise ValueError(f"Genre {genre_name} not found in data")
+
+    def stat_tables(self, genre=None):
+        # columnar stats for every template in the genre, built the first time the genre is selected
+        genre = genre or self.genre
+        stats = self.genre_stats.get(genre["genre"])
+        if stats is None:
+            stats = GenreStats(genre)
+            self.genre_stats[genre["genre"]] = stats
+        return stats
+
     def load_data(self):
+        if os.path.exists(self.json_path):
+            self.genre_cache = GenreCache.open(self.json_path)
+        self.genre_stats = {}
+        if self.genre_cache:
+            self.data = {"genres": LazyGenres(self.genre_cache)}
+            return
         try:
             with open(self.json_path, 'r') as file:
                 self.data = json.load(file)
         except (FileNotFoundError, ValueError) as e:
             logging.error(f"Error in loading data: {str(e)}")
+            return
+        try:
+            GenreCache.build(self.json_path, self.data)
+        except OSError as e:
+            # a read-only install (e.g. a frozen build) just keeps parsing the JSON
+            logging.info(f"Could not write the genre cache: {str(e)}")
         
-    def create_game_map(self, grid_width=9, grid_height=9, player=None):
+    def create_game_map(self, grid_width=9, grid_height=9, player=None, seed=None, placement_densities=None):
         # instantiates GameMap; returns a successful game map to data_loader.game_map (self.game_map, in here)
         if self.genre:
             elements = self.genre.get("elements")
             if elements:
-                self.game_map = GameMap(elements["rooms"], grid_width, grid_height, data_loader=self, player=player)
+                if self.map_pool and seed is None and not placement_densities and (grid_width, grid_height) == self.map_pool.grid_size:
+                    pooled_map = self.map_pool.take(self.genre["genre"], player.level if player else 1)
+                    if pooled_map:
+                        logging.info("Served a pre-generated game map from the pool")
+                        self.generation_attempts = 0
+                        self.game_map = pooled_map.attach(self, player)
+                        return self.game_map
+                cache_key = None
+                if self.map_cache and seed is not None:
+                    player_level = player.level if player else 1
+                    cache_key = self.map_cache.key(self.genre, seed, grid_width, grid_height, player_level, placement_densities)
+                    cached_map = self.map_cache.load(cache_key)
+                    if cached_map:
+                        logging.info(f"Loaded cached game map for seed {seed}")
+                        self.generation_attempts = 0
+                        self.game_map = cached_map.attach(self, player)
+                        return self.game_map
+                self.game_map = GameMap(elements["rooms"], grid_width, grid_height, data_loader=self, player=player, seed=seed,
+                                        placement_densities=placement_densities)
                 retries = 5  # maximum number of retries
+                self.generation_attempts = 0
                 for _ in range(retries):
+                    self.generation_attempts += 1
                     successful_generation = self.game_map.generate_game_map(elements["rooms"])
                     if successful_generation:
+                        if cache_key:
+                            self.map_cache.store(cache_key, self.game_map)
                         return self.game_map
         return False
 
+    def start_map_pool(self, grid_width=9, grid_height=9, depth=2, max_bytes=32 * 1024 * 1024, workers=1):
+        # worker processes keep `depth` ready maps per genre so level transitions skip generation
+        self.map_pool = MapPool(self.json_path, grid_width, grid_height, depth=depth, max_bytes=max_bytes, workers=workers)
+        self.map_pool.fill(self.genre_names())
+        return self.map_pool
+
+    def stop_map_pool(self):
+        if self.map_pool:
+            self.map_pool.close()
+            self.map_pool = None
+
+    def create_game_map_speculative(self, grid_width=9, grid_height=9, player=None, attempts=4, seed=None, placement_densities=None):
+        # races `attempts` seeds on worker processes and keeps the first map that passes validation. Opt-in only:
+        # a map has to be pickled across processes, so this only pays off with spare cores and seeds that often fail
+        if not self.genre:
+            return False
+        if self.speculative_generator is None:
+            self.speculative_generator = SpeculativeGenerator(self.json_path, workers=min(attempts, os.cpu_count() or 1))
+        game_map, self.generation_attempts = self.speculative_generator.race(self.genre["genre"], player.level if player else 1, grid_width, grid_height,
+                                                   attempts=attempts, seed=seed, placement_densities=placement_densities)
+        if not game_map:
+            return False
+        self.game_map = game_map.attach(self, player)
+        return self.game_map
+
+    def stop_speculative_generation(self):
+        if self.speculative_generator:
+            self.speculative_generator.close()
+            self.speculative_generator = None
+
+    def create_room_grid(self, grid_width, grid_height, player=None, seed=None):
+        # array-backed alternative to create_game_map for maps too large to hold as Room objects
+        if self.genre:
+            elements = self.genre.get("elements")
+            if elements:
+                room_grid = RoomGrid(elements["rooms"], grid_width, grid_height, data_loader=self, player=player, seed=seed)
+                if room_grid.generate():
+                    self.game_map = room_grid
+                    return room_grid
+        return False
+
+    def create_open_world(self, player=None, seed=None, chunk_size=9):
+        # only the starting chunk is generated here; the rest streams in as the player explores
+        if self.genre:
+            elements = self.genre.get("elements")
+            if elements:
+                open_world = OpenWorld(elements["rooms"], data_loader=self, player=player, seed=seed, chunk_size=chunk_size)
+                open_world.start()
+                self.game_map = open_world
+                return open_world
+        return False
+
+    def save_game(self, path, player):
+        save_game(path, self.get_game_map(), player, self.genre["genre"])
+
+    def load_game(self, path):
+        # the save names its genre, so loading switches genre before rebuilding the map
+        with SaveFile(path) as save_file:
+            self.game_map, player = save_file.restore(self)
+        return self.game_map, player
+
     def get_game_map(self):
         logging.debug(f"Current game map: {self.game_map}")
         if self.game_map:
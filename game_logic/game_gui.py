@@ -1,17 +1,20 @@
 import colorsys
-from .combat import Combat
+from .combat import Combat, FightOddsTask
+from .combat_odds import stat_tuple
 from .game_logic import Player, Key
 import logging
 from .map_window import MapWindow
 from matplotlib import colors
 from PySide6.QtWidgets import QWidget, QGridLayout, QTextEdit, QLabel, QPushButton, QSizePolicy, QHBoxLayout, QVBoxLayout, QFrame, QGridLayout
-from PySide6.QtCore import Qt, QCoreApplication, QThread, QTimer
+from PySide6.QtCore import Qt, QCoreApplication, QThread, QThreadPool, QTimer
 from PySide6.QtGui import QKeySequence, QShortcut
 from PySide6 import QtGui
 from PySide6.QtGui import QFont, QTextCharFormat, QTextCursor
 import random
 
 class GameGUI(QWidget):
+    max_text_blocks = 2000
+
     def __init__(self, data_loader=None):
         super().__init__()
         self.player = None
@@ -32,6 +35,11 @@ class GameGUI(QWidget):
         self.setFocusPolicy(Qt.StrongFocus)
         self.combat_object = None
         self.combat_thread = None
+        self.pending_fight_odds = None
+        self.announce_odds_for = None
+        # one solve at a time, and only for the latest request: odds for enemies walked past are dropped from the queue
+        self.fight_odds_pool = QThreadPool(self)
+        self.fight_odds_pool.setMaxThreadCount(1)
         self.data_loader = data_loader
         self.game_map = None
         self.initialize_game(won=False) # Instantiate the GameMap and Player from scratch
@@ -66,6 +74,14 @@ class GameGUI(QWidget):
         self.game_text_area.setAlignment(Qt.AlignCenter)
         self.game_text_area.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)        
         main_layout.addWidget(self.game_text_area)
+        # oldest paragraphs fall off the top, so a long session keeps the document (and every append) bounded
+        self.game_text_area.document().setMaximumBlockCount(self.max_text_blocks)
+        # combat text that arrives within one frame is appended to the widget in one go
+        self.pending_combat_text = []
+        self.combat_text_timer = QTimer(self)
+        self.combat_text_timer.setSingleShot(True)
+        self.combat_text_timer.setInterval(16)
+        self.combat_text_timer.timeout.connect(self.flush_combat_text)
         # Stats Frame (shows Player details)
         lowest_row_height = 280
         self.stats_label = QLabel("Player Stats")
@@ -473,6 +489,7 @@ class GameGUI(QWidget):
                 self.player.x -= 1
             self.current_room = next_room
             self.player.current_room = next_room
+            self.game_map.on_player_moved(next_room)
             self.game_text_area.clear()
             self.display_room(self.current_room)
             self.update_player_info()
@@ -480,9 +497,11 @@ class GameGUI(QWidget):
                 print(f"Ally is: {self.player.ally.name}.")
                 self.player.ally.x = self.player.x
                 self.player.ally.y = self.player.y
-                self.player.ally.current_room.ally = None
+                previous_room = self.player.ally.current_room
+                previous_room.ally = None
                 self.player.ally.current_room = self.current_room
                 self.current_room.ally = self.player.ally
+                self.game_map.placeables_changed(previous_room, self.current_room)
                 self.game_text_area.append(f"{self.player.ally.name} arrives.")
             self.update_interact_button()
             available_directions = [direction for direction, room in self.current_room.connected_rooms.items() if room is not None]
@@ -503,10 +522,43 @@ class GameGUI(QWidget):
             self.interact_button.setText("Unlock(X)") if has_key else self.interact_button.setText("Locked")
         elif current_room.enemy and not current_room.enemy.is_dead:
             self.interact_button.setText("Attack(X)")
+            self.interact_button.setToolTip("Win chance: estimating...")
+            self.request_fight_odds(current_room.enemy)
+            return
         elif current_room.ally and self.player.ally is None:
             self.interact_button.setText("Greet(X)")
         else:
             self.interact_button.setText("Interact(X)")
+        self.interact_button.setToolTip("")
+
+    def request_fight_odds(self, enemy):
+        key = (stat_tuple(self.player), stat_tuple(enemy))
+        if self.pending_fight_odds == (key, enemy):
+            return
+        self.pending_fight_odds = (key, enemy)
+        task = FightOddsTask(key, enemy)
+        task.signals.finished.connect(self.show_fight_odds)
+        self.fight_odds_pool.clear()
+        self.fight_odds_pool.start(task)
+
+    def show_fight_odds(self, result):
+        key, enemy, odds = result
+        if self.pending_fight_odds == (key, enemy):
+            self.pending_fight_odds = None
+        current_room = self.player.current_room
+        # the player may have moved, fought or changed equipment while the odds were being worked out
+        if odds is None or current_room.enemy is not enemy or enemy.is_dead or key != (stat_tuple(self.player), stat_tuple(enemy)):
+            return
+        if odds.expected_hp_loss is None:
+            text = "Win chance: 0%"
+        else:
+            text = f"Win chance: {odds.win_probability:.0%}, expected HP loss: {odds.expected_hp_loss:.0f}"
+        if self.interact_button.text() == "Attack(X)":
+            self.interact_button.setToolTip(text)
+        if self.announce_odds_for is enemy:
+            self.announce_odds_for = None
+            self.game_text_area.append(f"{text}.")
+            self.game_text_area.moveCursor(QtGui.QTextCursor.End)
 
     def get_current_room(self):
         room_name = self.game_text_area.toPlainText().split(":")[0]
@@ -528,6 +580,10 @@ class GameGUI(QWidget):
             item_description += f"<br><br>There is a {room.armor.name} here."
         if room.enemy:
             item_description += f"<br><br>You see a {room.enemy.name} here."
+            if not room.enemy.is_dead:
+                # the odds line follows once the thread pool has it; see show_fight_odds
+                self.announce_odds_for = room.enemy
+                self.request_fight_odds(room.enemy)
         if room.ally:
             item_description += f"<br><br>A {room.ally.name} is here."
         room_description = f"<b>{room.name}</b><br><br>{room.description}{item_description}"
@@ -579,6 +635,7 @@ class GameGUI(QWidget):
                 self.player.ev += item.evasion
                 self.player.armor = item
                 current_room.armor = None
+            self.game_map.placeables_changed(current_room)
             self.update_interact_button()
             self.update_inventory_text()
             self.update_player_stats()
@@ -610,7 +667,16 @@ class GameGUI(QWidget):
             self.beat_the_level0()
 
     def update_combat_text(self, text):
-        self.game_text_area.append(text)
+        self.pending_combat_text.append(text)
+        if not self.combat_text_timer.isActive():
+            self.combat_text_timer.start()
+
+    def flush_combat_text(self):
+        self.combat_text_timer.stop()
+        if not self.pending_combat_text:
+            return
+        self.game_text_area.append("".join(self.pending_combat_text))
+        self.pending_combat_text.clear()
         self.game_text_area.moveCursor(QtGui.QTextCursor.End)
 
     def show_self(self):
@@ -621,6 +687,8 @@ class GameGUI(QWidget):
         self.map_window.hide()
 
     def end_of_battle(self):
+        # the last round may still be waiting for its frame; it belongs above the summary
+        self.flush_combat_text()
         enemy = self.combat_object.enemies[0]
         rounds = self.combat_object.rounds
         p_hit_rate = self.combat_object.p_successful_attacks / rounds * 100
@@ -629,6 +697,7 @@ class GameGUI(QWidget):
         e_total_dmg = self.combat_object.e_total_damage
         if self.player.hp > 0:
             enemy.is_dead = True
+            self.game_map.placeables_changed(self.player.current_room)
             xp_award = enemy.calculate_xp_award(self.player.level)
             level_before = self.player.level
             self.player.gain_xp(xp_award)
@@ -1,11 +1,22 @@
-from .game_objects import Armor, Character, Healing, Key, Lock, Player, Room , Weapon 
+from .generation_profile import GenerationProfile
+from .map_renderer import DeferredRender, MapRenderer
+from .map_validator import DisjointSet, MapValidator
+from .room_graph import RoomGraph
+from .text_engine import compile_text_engine
+from .game_objects import Armor, Character, DIRECTION_BITS, Healing, Key, Lock, OPPOSITE_BITS, Player, Room , STEP_BITS, Weapon 
 import itertools
 import logging
 import numpy as np
 import random
+import time
+
+DENSITY_ATTRIBUTES = ("weapon", "armor", "enemy", "ally")
 
 class GameMap:
-    def __init__(self, rooms_data, grid_width, grid_height, data_loader, player=None):
+    def __init__(self, rooms_data, grid_width, grid_height, data_loader, player=None, seed=None, placement_densities=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
         self.data_loader = data_loader
         self.max_retries = 10
         self.target_rooms = grid_width * grid_height
@@ -27,81 +38,109 @@ class GameMap:
         self.room_to_cluster_map = {}
         self.mst = set()
         self.frontier_positions = set()
-        self.adj_cycle = self.init_cycle("adjectives")
-        self.name_cycle = self.init_cycle("name")
-        self.scenery_cycle = self.init_cycle("scenery")
-        self.atmosphere_cycle = self.init_cycle("atmosphere")
+        self.genre_name = data_loader.genre["genre"] if data_loader.genre else None
+        self.text_engine = compile_text_engine(rooms_data, self.genre_name)
+        self.room_texts = []
+        self.room_text_index = 0
         self.room_dict = {(x, y): None  for x in range(grid_width) for y in range(grid_height)}
+        self.occupancy = bytearray(grid_width * grid_height)
+        self.positions = []
+        self.position_index = {}
+        self.graph_version = 0
+        self.room_graph = None
+        self.validator = MapValidator(self)
+        self.last_validation = None
+        self.profile = GenerationProfile()
+        self.renderer = MapRenderer(self)
+        # fraction of rooms per placeable kind; the defaults (one of each item, three enemies, one ally) are the minimum
+        self.placement_densities = placement_densities or {}
         self.treasure = self.data_loader.treasure
 
-    def init_cycle(self, field):
-        all_items = [data[field] for data in self.rooms_data]
-        flattened_items = [item for sublist in all_items for item in sublist]
-        random.shuffle(flattened_items)
-        return itertools.cycle(flattened_items)
+    def __getstate__(self):
+        # the data loader, player and name cycles belong to the session, not the map; attach() restores them
+        state = self.__dict__.copy()
+        for attr in ("data_loader", "player", "room_graph", "renderer", "text_engine", "room_texts"):
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.data_loader = None
+        self.player = None
+        self.room_graph = None
+        self.renderer = MapRenderer(self)
+        self.text_engine = None
+        self.room_texts = []
+        for room in self.rooms:
+            room.room_grid = self.room_dict
+
+    def attach(self, data_loader, player=None):
+        self.data_loader = data_loader
+        self.player = player if player else Player()
+        self.treasure = data_loader.treasure
+        self.text_engine = compile_text_engine(self.rooms_data, self.genre_name)
+        return self
 
     def is_adjacent_position(self, pos1, pos2):
         x1, y1 = pos1
         x2, y2 = pos2
         return abs(x1 - x2) + abs(y1 - y2) == 1
 
+    def placement_counts(self, room_count, enemy_count):
+        counts = {"key_item": 1, "lock_item": 1, "weapon": 1, "armor": 1, "enemy": enemy_count, "ally": 1}
+        for attribute, density in self.placement_densities.items():
+            if attribute not in DENSITY_ATTRIBUTES:
+                raise ValueError(f"No placement density for {attribute}; expected one of {DENSITY_ATTRIBUTES}")
+            counts[attribute] = max(counts[attribute], int(density * room_count))
+        return counts
+
+    def shuffled(self, items):
+        items = items.copy()
+        self.rng.shuffle(items)
+        return items
+
     def add_placeables(self, all_rooms, enemy_count):
-        # This function creates an infinite cycle from a list.
-        def create_cycle_from_list(item_list):
-            random.shuffle(item_list)
-            return itertools.cycle(item_list)
-
-        placeable_methods = [
-            self.generate_key,
-            self.generate_lock,
-            self.generate_weapon,
-            self.generate_armor,
-        ] + [self.generate_character] * (enemy_count + 1)
-
-        game_data = {
-            "key_item": create_cycle_from_list(self.data_loader.genre["elements"]["puzzle_items"].copy()),
-            "lock_item": create_cycle_from_list(self.data_loader.genre["elements"]["puzzle_items"].copy()),
-            "weapon": create_cycle_from_list(self.data_loader.genre["elements"]["weapons"].copy()),
-            "armor": create_cycle_from_list(self.data_loader.genre["elements"]["armor"].copy()),
-        }
-        self.character_cycle = create_cycle_from_list(self.data_loader.genre["elements"]["characters"])
-        
-        placeable_data = [
-            next(game_data["key_item"]),
-            next(game_data["lock_item"]),
-            next(game_data["weapon"]),
-            next(game_data["armor"]),
-        ]
+        elements = self.data_loader.genre["elements"]
+        possible_locations = [room for room in all_rooms if room is not self.player_start_room]
+        counts = self.placement_counts(len(possible_locations), enemy_count)
+        if len(possible_locations) < sum(counts.values()):
+            raise Exception("Not enough rooms for all placeable items!")
+        # one draw without replacement gives every placeable its own room
+        targets = self.np_rng.choice(len(possible_locations), size=sum(counts.values()), replace=False).tolist()
         start_level_diff = max(1, self.player.level - 5)
         end_level_diff = self.player.level + 5
         level_diffs = list(range(start_level_diff, end_level_diff))
         full_weights = [6 - abs(i) for i in range(-5, 6)]
-        weights = full_weights[(start_level_diff - 1):(end_level_diff - 1)]
-        for _ in range(enemy_count):
-            placeable_data.append(self.generate_character_data(weights, level_diffs, True))
-        
-        
-        placeable_data.append(self.generate_character_data(weights, level_diffs, False))
-        placeable_attributes = ["key_item", "lock_item", "weapon", "armor"]
-        placeable_attributes.extend("enemy" for _ in range(enemy_count))
-        placeable_attributes.append("ally")
-        possible_locations = all_rooms.copy()
-        if self.player_start_room in possible_locations:
-            possible_locations.remove(self.player_start_room)
-        if len(possible_locations) < len(placeable_data):
-            raise Exception("Not enough rooms for all placeable items!")
-        for method, data, attr in zip(placeable_methods, placeable_data, placeable_attributes):
-            room = random.choice(possible_locations)
-            placeable = method(*data) if isinstance(data, tuple) else method(data)
+        weights = np.array(full_weights[(start_level_diff - 1):(end_level_diff - 1)], dtype=float)
+        levels = self.np_rng.choice(level_diffs, size=counts["enemy"] + counts["ally"], p=weights / weights.sum()).tolist()
+        stats = self.data_loader.stat_tables()
+        keys = self.shuffled(elements["puzzle_items"])
+        locks = self.shuffled(elements["puzzle_items"])
+        weapons = self.shuffled(list(range(len(stats.weapons))))
+        armor = self.shuffled(list(range(len(stats.armor))))
+        characters = self.shuffled(list(range(len(stats.characters))))
+        placeables = [("key_item", self.generate_key(keys[i % len(keys)])) for i in range(counts["key_item"])]
+        placeables += [("lock_item", self.generate_lock(locks[i % len(locks)])) for i in range(counts["lock_item"])]
+        for i in range(counts["weapon"]):
+            row = weapons[i % len(weapons)]
+            placeables.append(("weapon", Weapon(stats.weapons.names[row], *stats.weapons.row(row))))
+        for i in range(counts["armor"]):
+            row = armor[i % len(armor)]
+            placeables.append(("armor", Armor(stats.armor.names[row], *stats.armor.row(row))))
+        # enemies and allies are rolled as one batch: stats one column at a time, names in one pass of the text engine
+        rows = [characters[i % len(characters)] for i in range(len(levels))]
+        hostile = [i < counts["enemy"] for i in range(len(levels))]
+        rolled = stats.character_stats(rows, levels, self.np_rng).tolist()
+        # Character.__init__ has always decorated names by the level itself, not the level difference
+        names = self.text_engine.decorated_names([stats.characters.names[row] for row in rows], hostile, levels, self.np_rng)
+        for name, level, is_enemy, character_stats in zip(names, levels, hostile, rolled):
+            character = Character.from_rolled(name, level, *character_stats, is_enemy)
+            placeables.append(("enemy" if is_enemy else "ally", character))
+        for target, (attr, placeable) in zip(targets, placeables):
+            room = possible_locations[target]
             setattr(room, attr, placeable)
             placeable.current_room = room
-            possible_locations.remove(room)
 
-    def generate_character_data(self, weights, level_diffs, is_enemy):
-        character = next(self.character_cycle)
-        level = np.random.choice(level_diffs, p=np.array(weights)/sum(weights))
-        return character, level, is_enemy
-    
     def add_room(self, room, x, y, cluster_id, last_added_room=None, is_first_room=False):
         self._add_room_to_maps_and_list(room, x, y)
         if is_first_room:
@@ -115,9 +154,17 @@ class GameMap:
             self._connect_rooms(room, last_added_room)
         self._connect_to_existing_room(room)
         self._manage_room_clusters(room, cluster_id)
-        self.positions.remove((x, y))
+        self._remove_free_position((x, y))
         return room
 
+    def _remove_free_position(self, position):
+        # swap-and-pop so claiming a cell stays O(1) however large the grid is
+        index = self.position_index.pop(position)
+        last_position = self.positions.pop()
+        if last_position != position:
+            self.positions[index] = last_position
+            self.position_index[last_position] = index
+
     def _get_position(self, x, y):
         if x is None or y is None:
             x, y = self.find_free_random_position()
@@ -133,6 +180,8 @@ class GameMap:
 
     def _add_room_to_maps_and_list(self, room, x, y):
         self.room_dict[(x, y)] = room
+        room.room_grid = self.room_dict
+        self.occupancy[y * self.grid_width + x] = 1
         self.rooms.append(room)
 
     def _connect_to_existing_room(self, new_room):
@@ -172,7 +221,7 @@ class GameMap:
         if cluster_id in self.room_clusters:
             rooms = self.room_clusters[cluster_id]
             rooms.append(room)
-            random.shuffle(rooms)
+            self.rng.shuffle(rooms)
         else:
             self.room_clusters[cluster_id] = [room]
 
@@ -217,24 +266,22 @@ class GameMap:
         return not is_already_connected and room1_has_space and room2_has_space and rooms_are_adjacent
     
     def connect_clusters(self):
+        # only grid neighbours can ever connect, so east/south of each room covers every candidate pair once
         edges = []
         for room1 in self.rooms:
-            for room2 in self.rooms:
-                if room1 != room2:
-                    can_connect = self.can_connect_rooms(room1, room2)
-                    if can_connect:
-                        distance = self.manhattan_distance(room1, room2)
-                        edges.append((distance, room1, room2))
-        edges.sort()
-        sets = {room: {room} for room in self.rooms}
-        for distance, room1, room2 in edges:
-            if sets[room1] != sets[room2]:
+            for dx, dy in ((1, 0), (0, 1)):
+                room2 = self.room_dict.get((room1.x + dx, room1.y + dy))
+                if room2 is not None and self.can_connect_rooms(room1, room2):
+                    edges.append((room1, room2))
+        edges.sort(key=lambda edge: (edge[0].count_connections(), edge[1].count_connections()))
+        components = DisjointSet(self.grid_width * self.grid_height)
+        for room1, room2 in edges:
+            index1 = room1.y * self.grid_width + room1.x
+            index2 = room2.y * self.grid_width + room2.x
+            if components.find(index1) != components.find(index2):
                 direction = self.calculate_direction(room1, room2)
-                connect_result = self.connect_rooms(room1, room2, direction)
-                if connect_result:
-                    union = sets[room1].union(sets[room2])
-                    for room in union:
-                        sets[room] = union
+                if self.connect_rooms(room1, room2, direction):
+                    components.union(index1, index2)
 
     def manhattan_distance(self, room1, room2):
         x1, y1 = room1.grid_position
@@ -252,12 +299,9 @@ class GameMap:
         opposite = self.opposite_direction(direction)
         if self.is_connected(room1, room2):
             return False
-        room1.connected_rooms[direction] = room2
-        room2.connected_rooms[opposite] = room1
-        pos1 = (room1.x, room1.y)
-        pos2 = (room2.x, room2.y)
-        self.room_dict[pos1].connected_rooms[direction] = self.room_dict[pos2]
-        self.room_dict[pos2].connected_rooms[opposite] = self.room_dict[pos1]
+        room1.connections |= DIRECTION_BITS[direction]
+        room2.connections |= DIRECTION_BITS[opposite]
+        self.graph_version += 1
         return True
 
     def create_and_place_items(self, all_rooms):
@@ -266,7 +310,7 @@ class GameMap:
         possible_locations.remove(self.player_start_room)  
         for item_type in item_types:
             item = self.create_item(item_type)
-            room = random.choice(possible_locations)
+            room = self.rng.choice(possible_locations)
             room.add_item(item)
             possible_locations.remove(room)
 
@@ -290,9 +334,9 @@ class GameMap:
         for pos in initial_frontier_positions:
             frontier_source_rooms[pos] = start_room
         rooms_in_cluster = 1
-        cluster_target = random.randint(min_rooms, max_rooms)
+        cluster_target = self.rng.randint(min_rooms, max_rooms)
         while self.frontier_positions and rooms_in_cluster < cluster_target:
-            position_index = random.randrange(len(self.frontier_positions))
+            position_index = self.rng.randrange(len(self.frontier_positions))
             position = self.frontier_positions.pop(position_index)
             last_added_room = frontier_source_rooms.pop(position)
             new_room = self.generate_room(room_type, *position)
@@ -304,7 +348,7 @@ class GameMap:
             self.frontier_positions.extend(new_positions)
             for pos in new_positions:
                 frontier_source_rooms[pos] = last_added_room
-            random.shuffle(self.frontier_positions)
+            self.rng.shuffle(self.frontier_positions)
         return rooms_in_cluster >= 1
     
     def favor_square_cluster(self, current_pos, visited_positions):
@@ -326,13 +370,11 @@ class GameMap:
             if self.is_position_free(x, y):
                 return (x, y)
         elif self.frontier_positions:
-            for position in random.sample(self.frontier_positions, len(self.frontier_positions)):
+            for position in self.rng.sample(self.frontier_positions, len(self.frontier_positions)):
                 if self.is_position_free(*position):
                     return position
-        else:
-            free_positions = [pos for pos in self.positions if self.is_position_free(*pos)]
-            if free_positions:
-                return random.choice(free_positions)
+        elif self.positions:
+            return self.rng.choice(self.positions)
         return None
         
     def generate_key(self, key_data):
@@ -344,28 +386,34 @@ class GameMap:
     def generate_healing(self, healing_data):
         return Healing(healing_data["type"], healing_data["stats"]["hp"])
 
-    def generate_weapon(self, weapon_data):
-        return Weapon(weapon_data["type"], weapon_data["stats"]["damage"], weapon_data["stats"]["accuracy"])
-
-    def generate_armor(self, armor_data):
-        return Armor(armor_data["type"], armor_data["stats"]["defp"], armor_data["stats"]["ev"])
-
-    def generate_character(self, character_data, level, is_enemy = True):
-        return Character(character_data["type"],
-                         level,
-                         character_data["stats"]["hp"], 
-                         character_data["stats"]["atk"], 
-                         character_data["stats"]["defp"], 
-                         character_data["stats"]["acc"], 
-                         character_data["stats"]["ev"],
-                         is_enemy)
-
-    def generate_game_map(self, rooms_data):
+    @property
+    def graph(self):
+        if self.room_graph is None:
+            self.room_graph = RoomGraph(self)
+        return self.room_graph
+
+    def generate_game_map(self, rooms_data, cancelled=None):
+        # cancelled, if given, is polled between generation phases; a True answer abandons the attempt
+        attempt = self.profile.start_attempt()
+        succeeded = self._generate_game_map(rooms_data, attempt, cancelled)
+        # the rooms keep the fragments they drew; the unused remainder of the plan is dropped
+        self.room_texts = []
+        attempt.finish(succeeded)
+        return succeeded
+
+    def _generate_game_map(self, rooms_data, attempt, cancelled=None):
+        clock = time.perf_counter
+        self.graph_version += 1
         self.rooms = []
         self.room_clusters = {}
+        self.room_dict = {(x, y): None  for x in range(self.grid_width) for y in range(self.grid_height)}
+        self.occupancy = bytearray(self.grid_width * self.grid_height)
         room_types = [data["type"] for data in rooms_data]
         self.rooms_data = rooms_data
-        random.shuffle(room_types)
+        self.text_engine = compile_text_engine(rooms_data, self.genre_name)
+        self.room_texts = self.text_engine.room_texts(self.rng, self.target_rooms)
+        self.room_text_index = 0
+        self.rng.shuffle(room_types)
         logging.info(f"Room types selected are: {room_types}")
         self.generate_positions()
         self.cluster_roots = []
@@ -373,10 +421,15 @@ class GameMap:
         all_rooms = []
         cluster_id = 0
         while self.is_map_full is False:
+            if cancelled is not None and cancelled():
+                logging.info("Map generation cancelled")
+                return False
             logging.debug(f"Current state of is_map_full: {self.is_map_full}")
             room_type = next(room_type_cycle)
             logging.info(f"Attempting to create cluster {cluster_id} with room type {room_type}")
+            start = clock()
             cluster_created = self.create_cluster(room_type, cluster_id)
+            attempt.record("create_cluster", clock() - start)
             logging.info(f"Cluster creation result: {cluster_created}")
             cluster_id += 1
             if not cluster_created:
@@ -388,13 +441,31 @@ class GameMap:
                 self.set_player_start_room(cluster_rooms[0])
                 logging.info(f"The player's start room is: {self.player_start_room.x}, {self.player_start_room.y}")
             all_rooms.extend(cluster_rooms)
+            start = clock()
             for room in cluster_rooms:
                 self._connect_room_to_surroundings(room)
+            attempt.record("_connect_room_to_surroundings", clock() - start)
             if self.is_map_full:
                 break
+        if cancelled is not None and cancelled():
+            logging.info("Map generation cancelled")
+            return False
+        start = clock()
         self.connect_clusters()
+        attempt.record("connect_clusters", clock() - start)
+        start = clock()
+        self.validator.repair()
+        attempt.record("repair", clock() - start)
+        start = clock()
         self.add_placeables(all_rooms, enemy_count=3)
-        logging.info(self.render_fancy_map())
+        attempt.record("add_placeables", clock() - start)
+        start = clock()
+        self.last_validation = self.validator.validate()
+        attempt.record("validate", clock() - start)
+        if not (self.last_validation.key_reachable and self.last_validation.lock_reachable):
+            logging.error(f"Generated map failed validation: {self.last_validation}")
+            return False
+        logging.info(DeferredRender(self.renderer.render))
         if self.is_map_full:
             for room in all_rooms:
                 if room.key_item:
@@ -415,23 +486,25 @@ class GameMap:
 
     def generate_positions(self):
         positions = [(x, y) for x in range(self.grid_width) for y in range(self.grid_height)]
-        random.shuffle(positions)
+        self.rng.shuffle(positions)
         self.positions = positions
+        self.position_index = {pos: index for index, pos in enumerate(positions)}
     
     def generate_room(self, room_type, x, y):
-        adjective = next(self.adj_cycle).title()
-        name = next(self.name_cycle).title()
-        scene = next(self.scenery_cycle)
-        atmos = next(self.atmosphere_cycle)
-        unique_name = f'{adjective} {name}'
-        unique_description = f'{scene} {atmos}'
-        room = Room(room_type, unique_name, unique_description, x, y)
+        # the fragments are shared with every other room that drew them; Room joins them on demand.
+        # a map that was reloaded has used up its plan, so the next stretch is drawn on request
+        if self.room_text_index >= len(self.room_texts):
+            self.room_texts = self.text_engine.room_texts(self.rng, self.target_rooms)
+            self.room_text_index = 0
+        name, description = self.room_texts[self.room_text_index]
+        self.room_text_index += 1
+        room = Room(room_type, name, description, x, y)
         return room
 
     def get_free_adjacent_positions(self, position, cluster_id):
         x, y = position
         possible_positions = [(x + dx, y + dy) for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]]
-        random.shuffle(possible_positions)
+        self.rng.shuffle(possible_positions)
         return [pos for pos in possible_positions if self.is_position_in_map(pos) and self.is_position_free(*pos) and pos not in self.frontier_positions and self.is_adjacent_to_cluster(pos, cluster_id)]
     
     def is_adjacent_to_cluster(self, position, cluster_id):
@@ -465,7 +538,12 @@ class GameMap:
         )
     
     def is_connected(self, room1, room2):
-        return room2 in room1.connected_rooms.values() and room1 in room2.connected_rooms.values()
+        dx = room2.x - room1.x
+        dy = room2.y - room1.y
+        if dx * dx + dy * dy != 1:
+            return False
+        bit = STEP_BITS[dx + 3 * dy + 4]
+        return room1.connections & bit != 0 and room2.connections & OPPOSITE_BITS[bit] != 0
     
     @property
     def is_map_full(self):
@@ -475,10 +553,7 @@ class GameMap:
     def is_position_free(self, x, y):
         if x < 0 or x >= self.grid_width or y < 0 or y >= self.grid_height:
             return False
-        for room in self.rooms:
-            if room.x == x and room.y == y:
-                return False
-        return True
+        return not self.occupancy[y * self.grid_width + x]
 
     @staticmethod
     def opposite_direction(direction):
@@ -488,47 +563,17 @@ class GameMap:
     def set_player_start_room(self, room):
         self.player_start_room = room
 
-    def render_fancy_map(self):
-        rendered_map = [[' ' for _ in range(2*self.grid_width)] for _ in range(2*self.grid_height)]
-        for room in self.rooms:
-            if room is None:
-                logging.warning(f"Room at position ({room.x}, {room.y} is None)")
-            if room is not None:
-                if room == self.player.current_room:
-                    rendered_map[2*room.y][2*room.x] = 'P'
-                elif room.enemy:
-                    rendered_map[2*room.y][2*room.x] = 'E'
-                elif room.weapon:
-                    rendered_map[2*room.y][2*room.x] = 'W'
-                elif room.armor:
-                    rendered_map[2*room.y][2*room.x] = 'A'
-                elif room.key_item:
-                    rendered_map[2*room.y][2*room.x] = 'K'
-                elif room.lock_item:
-                    rendered_map[2*room.y][2*room.x] = 'L'
-                elif room.ally:
-                    rendered_map[2*room.y][2*room.x] = 'Y'
-                else:
-                    rendered_map[2*room.y][2*room.x] = 'X'
-                for direction, connected_room in room.connected_rooms.items():
-                    if connected_room is not None:
-                        if direction == "north" and 2*room.y - 1 >= 0:
-                            rendered_map[2*room.y - 1][2*room.x] = '|'
-                        elif direction == "south" and 2*room.y + 1 < len(rendered_map):
-                            rendered_map[2*room.y + 1][2*room.x] = '|'
-                        elif direction == "west" and 2*room.x - 1 >= 0:
-                            rendered_map[2*room.y][2*room.x - 1] = '-'
-                        elif direction == "east" and 2*room.x + 1 < len(rendered_map[0]):
-                            rendered_map[2*room.y][2*room.x + 1] = '-'
-                    else:
-                        pass
-        return '\n'.join([''.join(row) for row in rendered_map])
-
-    def render_map(self):
-        rendered_grid = [[' ']*self.grid_width for _ in range(self.grid_height)]
-        for (x, y), room in self.room_dict.items():
-            if room is not None:
-                rendered_grid[y][x] = 'X'
-        rendered_map = '\n'.join(''.join(row) for row in rendered_grid)
-        return rendered_map
+    def on_player_moved(self, room):
+        # a fixed map is fully generated up front; OpenWorld uses this to stream chunks in and out
+        pass
+
+    def placeables_changed(self, *rooms):
+        # the renderer keeps its canvas between calls, so whoever moves an item or character in or out of a room says so here
+        for room in rooms:
+            self.renderer.refresh_room(room)
+
+    def render_fancy_map(self, center=None, width=40, height=20):
+        return self.renderer.render(center, width, height)
 
+    def render_map(self, center=None, width=40, height=20):
+        return self.renderer.render_rooms(center, width, height)
@@ -1,17 +1,67 @@
-from collections import defaultdict
+from collections import namedtuple
+from .text_engine import decorated_name
 import logging
 import random
-from random import choice
+
+NORTH, SOUTH, EAST, WEST = 1, 2, 4, 8
+DIRECTIONS = ("north", "south", "east", "west")
+DIRECTION_BITS = {"north": NORTH, "south": SOUTH, "east": EAST, "west": WEST}
+DIRECTION_OFFSETS = {"north": (0, -1), "south": (0, 1), "east": (1, 0), "west": (-1, 0)}
+OFFSET_BITS = {(0, -1): NORTH, (0, 1): SOUTH, (1, 0): EAST, (-1, 0): WEST}
+OPPOSITE_BITS = {NORTH: SOUTH, SOUTH: NORTH, EAST: WEST, WEST: EAST}
+# OFFSET_BITS as a flat table: index dx + 3 * dy + 4 for any offset within one step, 0 on the centre and diagonals
+STEP_BITS = (0, NORTH, 0, WEST, 0, EAST, 0, SOUTH, 0)
+CONNECTION_COUNTS = tuple(bin(mask).count("1") for mask in range(16))
+OPEN_DIRECTIONS = tuple(tuple(direction for direction in DIRECTIONS if mask & DIRECTION_BITS[direction]) for mask in range(16))
+CLOSED_DIRECTIONS = tuple(tuple(direction for direction in DIRECTIONS if not mask & DIRECTION_BITS[direction]) for mask in range(16))
+
+class ConnectedRooms:
+    # read-only dict-like view over Room.connections; neighbours are looked up in the room's grid index on access.
+    # Doors are added through the map's connect_rooms, which sets both sides and bumps graph_version
+    def __init__(self, room):
+        self.room = room
+
+    def __getitem__(self, direction):
+        room = self.room
+        if not room.connections & DIRECTION_BITS[direction] or room.room_grid is None:
+            return None
+        dx, dy = DIRECTION_OFFSETS[direction]
+        return room.room_grid.get((room.x + dx, room.y + dy))
+
+    def __contains__(self, direction):
+        return direction in DIRECTION_BITS
+
+    def __iter__(self):
+        return iter(DIRECTIONS)
+
+    def __len__(self):
+        return len(DIRECTIONS)
+
+    def get(self, direction, default=None):
+        return self[direction] if direction in DIRECTION_BITS else default
+
+    def keys(self):
+        return DIRECTIONS
+
+    def items(self):
+        return [(direction, self[direction]) for direction in DIRECTIONS]
+
+    def values(self):
+        return [self[direction] for direction in DIRECTIONS]
 
 class Room:
+    __slots__ = ("type", "name_parts", "description_parts", "connections", "room_grid", "x", "y", "key_item", "lock_item", "enemy",
+                 "ally", "weapon", "armor", "items", "cluster_id", "max_connections")
+
     def __init__(self, room_type, name, description, x=0, y=0, max_connections=4, cluster_id=None):
         self.type = room_type
-        self.name = name
-        self.description = description
-        self.connected_rooms = defaultdict(lambda: None, {"north": None, "south": None, "east": None, "west": None})
+        # name and description may be given as tuples of shared fragments; they are joined only when read
+        self.name_parts = name if isinstance(name, tuple) else (name,)
+        self.description_parts = description if isinstance(description, tuple) else (description,)
+        self.connections = 0
+        self.room_grid = None
         self.x = x
         self.y = y
-        self.grid_position = (x, y)
         self.key_item = None
         self.lock_item = None
         self.enemy = None
@@ -19,10 +69,6 @@ class Room:
         self.weapon = None
         self.armor = None
         self.items = []
-        if name != "":
-            self.symbol = name[0]
-        else:
-            self.symbol = " "
         self.cluster_id = cluster_id
         self.max_connections = max_connections
 
@@ -50,20 +96,53 @@ class Room:
         room_str = f"{self.name} ({self.type}): {self.description}\n\nItems: {item_descriptions_str}\n\nConnections: {connections}"
         return room_str
 
-    def count_connections(room):
-        return len([direction for direction, connected_room in room.connected_rooms.items() if connected_room is not None])
+    def __getstate__(self):
+        # the mask travels with the room; whoever unpickles the map re-attaches the grid index
+        state = {slot: getattr(self, slot) for slot in self.__slots__}
+        state["room_grid"] = None
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    @property
+    def name(self):
+        return " ".join(self.name_parts)
+
+    @property
+    def description(self):
+        return " ".join(self.description_parts)
+
+    @property
+    def grid_position(self):
+        return (self.x, self.y)
+
+    @property
+    def symbol(self):
+        return self.name[0] if self.name != "" else " "
+
+    @property
+    def connected_rooms(self):
+        return ConnectedRooms(self)
+
+    def count_connections(self):
+        return CONNECTION_COUNTS[self.connections]
 
     @property
     def id(self):
         return f"{self.x}-{self.y}"
 
     def available_connections(self):
-            possible_directions = ["north", "south", "east", "west"]
-            return [direction for direction in possible_directions if self.connected_rooms[direction] is None]
-    
+        return list(CLOSED_DIRECTIONS[self.connections])
+
     def get_adjacent_rooms(self):
+        if self.room_grid is None:
+            return []
         adjacent_rooms = []
-        for _, room in self.connected_rooms.items():
+        for direction in OPEN_DIRECTIONS[self.connections]:
+            dx, dy = DIRECTION_OFFSETS[direction]
+            room = self.room_grid.get((self.x + dx, self.y + dy))
             if room is not None:
                 adjacent_rooms.append(room)
         return adjacent_rooms
@@ -74,56 +153,110 @@ class Room:
     def remove_item(self, item):
         self.items.remove(item)
 
+ItemTemplate = namedtuple("ItemTemplate", ["kind", "name", "details", "stats"])
+
 class Item:
-    def __init__(self, name, details):
-        self.name = name
+    __slots__ = ("template", "current_room")
+    templates = {}
+
+    def __init__(self, name, details, stats=()):
+        self.template = self.intern_template(name, details, stats)
         self.current_room = None
-        self.details = details
 
-class Healing:
+    @classmethod
+    def intern_template(cls, name, details, stats):
+        # identical items from data.json share one immutable template; only current_room is per instance
+        key = (cls.__name__, name, stats)
+        template = Item.templates.get(key)
+        if template is None:
+            template = ItemTemplate(cls.__name__, name, details() if callable(details) else details, stats)
+            Item.templates[key] = template
+        return template
+
+    @property
+    def name(self):
+        return self.template.name
+
+    @property
+    def details(self):
+        return self.template.details
+
+class Healing(Item):
+    __slots__ = ()
+
     def __init__(self, name, hp):
-        self.name = name
-        self.current_room = None
-        self.hp = hp
+        super().__init__(name, lambda: f"This item restores {hp} hit points.", (hp,))
+
+    @property
+    def hp(self):
+        return self.template.stats[0]
 
 class Key(Item):
+    __slots__ = ()
+
     def __init__(self, name, unlock_room):
-        super().__init__(name, "This key can unlock " + unlock_room)
-        self.current_room = None
-        self.unlock_room = unlock_room
+        super().__init__(name, lambda: "This key can unlock " + unlock_room, (unlock_room,))
+
+    @property
+    def unlock_room(self):
+        return self.template.stats[0]
 
 class Lock(Item):
+    __slots__ = ()
+
     def __init__(self, name, locked_room):
-        super().__init__(name, "This lock can be opened with a key for " + locked_room)
-        self.current_room = None
-        self.locked_room = locked_room
+        super().__init__(name, lambda: "This lock can be opened with a key for " + locked_room, (locked_room,))
+
+    @property
+    def locked_room(self):
+        return self.template.stats[0]
 
 class Weapon(Item):
+    __slots__ = ()
+
     def __init__(self, name, damage, accuracy):
-        super().__init__(name, "This weapon can cause " + str(damage) + " points of damage.")
-        self.current_room = None
-        self.damage = damage
-        self.accuracy = accuracy
+        super().__init__(name, lambda: "This weapon can cause " + str(damage) + " points of damage.", (damage, accuracy))
+
+    @property
+    def damage(self):
+        return self.template.stats[0]
+
+    @property
+    def accuracy(self):
+        return self.template.stats[1]
 
 class Armor(Item):
+    __slots__ = ()
+
     def __init__(self, name, defp, ev):
-        super().__init__(name, "This armor can defend against " + str(defp) + " points of damage.")
-        self.current_room = None
-        self.defense = defp
-        self.evasion = ev
+        super().__init__(name, lambda: "This armor can defend against " + str(defp) + " points of damage.", (defp, ev))
+
+    @property
+    def defense(self):
+        return self.template.stats[0]
+
+    @property
+    def evasion(self):
+        return self.template.stats[1]
 
 class Character:
-    def __init__(self, name, level, hp, atk, defp, acc, ev, wt, at, is_enemy):
+    __slots__ = ("name", "level", "hp", "atk", "defp", "acc", "ev", "weapon", "armor", "inventory", "current_room", "x", "y",
+                 "is_enemy", "ally", "is_dead", "weapon_tier", "armor_tier")
+    base_xp_reward = 100
+    base_xp_peak = 250
+
+    def __init__(self, name, level, hp, atk, defp, acc, ev, wt, at, is_enemy, rng=None):
+        rng = rng or random
         if not isinstance(self, Player):
-            self.name = self.generate_decorated_name(name, is_enemy, level)
+            self.name = self.generate_decorated_name(name, is_enemy, level, rng)
         else:
             self.name = name
         self.level = level
-        self.hp = hp + sum(random.randint(2, 12) for _ in range(self.level))
-        self.atk = atk + sum(random.randint(1, 3) for _ in range(self.level)) 
-        self.defp = defp + sum(random.randint(1, 2) for _ in range(self.level))
-        self.acc = acc + sum(random.randint(1, 2) for _ in range(self.level))
-        self.ev = ev + sum(random.randint(1, 2) for _ in range(self.level))
+        self.hp = hp + sum(rng.randint(2, 12) for _ in range(self.level))
+        self.atk = atk + sum(rng.randint(1, 3) for _ in range(self.level)) 
+        self.defp = defp + sum(rng.randint(1, 2) for _ in range(self.level))
+        self.acc = acc + sum(rng.randint(1, 2) for _ in range(self.level))
+        self.ev = ev + sum(rng.randint(1, 2) for _ in range(self.level))
         
         
         self.weapon = None
@@ -135,11 +268,29 @@ class Character:
         self.is_enemy = is_enemy
         self.ally = None
         self.is_dead = False
-        self.base_xp_reward = 100
-        self.base_xp_peak = 250
         self.weapon_tier = wt
         self.armor_tier = at
         
+    @classmethod
+    def from_rolled(cls, name, level, hp, atk, defp, acc, ev, is_enemy):
+        # for stats and names already rolled in bulk; __init__ would roll them again
+        character = cls.__new__(cls)
+        character.name = name
+        character.level = level
+        character.hp, character.atk, character.defp, character.acc, character.ev = hp, atk, defp, acc, ev
+        character.weapon = None
+        character.armor = None
+        character.inventory = []
+        character.current_room = None
+        character.x = 0
+        character.y = 0
+        character.is_enemy = is_enemy
+        character.ally = None
+        character.is_dead = False
+        character.weapon_tier = 0
+        character.armor_tier = 0
+        return character
+
     def xp_required_to_level_up(self):
         return self.base_xp_peak * (1.5 ** (self.level - 1)) 
 
@@ -161,33 +312,8 @@ class Character:
         return random.randint(1, 20) + self.ev
  
     @staticmethod
-    def generate_decorated_name(base_name, is_hostile, level_difference):
-        descriptors = {
-            5: ["Elite", "Battle-Hardened", "Steely", "Hardened", "Ruthless", "Dauntless"],
-            4: ["Seasoned", "Practiced", "Adept", "Wise", "Veteran", "Proficient"],
-            3: ["Challenging", "Full-grown", "Trained", "Tricky"],
-            2: ["Tough", "Experienced", "Solid", "Rugged", "Stout", "Strong"],
-            1: ["Wily", "Cunning", "Spirited", "Fiery", "Energetic", "Ambitious"],
-            0: ["Normal", "Average", "Standard", "Regular", "Usual"],
-            -1: ["Hesitant", "Unprepared", "Immature", "Bruised", "Sick-looking"],
-            -2: ["Innocuous", "Harmless", "Old", "Scowling", "Unfortunate"],
-            -3: ["Inexperienced", "Novice", "Beginner", "Rookie"],
-            -4: ["Weak", "Fragile", "Frail", "Feeble", "Tottering", "Sickly"],
-            -5: ["Helpless", "Uninteresting", "Inept", "Ineffectual", "Sad", "Lame"]
-}
-        friendly_synonyms = ["friendly", "ally", "peaceful", "relaxed", "polite", "smiling"]
-        hostile_synonyms = ["hostile", "enemy", "angry", "violent", "rude", "crazed"]
-        if level_difference > 5:
-            level_difference = 5
-        elif level_difference < -5:
-            level_difference = -5
-        
-        if level_difference not in descriptors:
-            level_difference = "Unknown"
-        else:
-            level_difference = choice(descriptors[level_difference])
-        type_desc = choice(hostile_synonyms if is_hostile else friendly_synonyms)
-        return f"{level_difference} {base_name} ({type_desc})"
+    def generate_decorated_name(base_name, is_hostile, level_difference, rng=None):
+        return decorated_name(base_name, is_hostile, level_difference, rng)
 
     def pick_up(self, item):
             ...
@@ -203,6 +329,8 @@ class Character:
         self.current_room.add_item(item)
 
 class Player(Character):
+    __slots__ = ("xp", "key")
+
     def __init__(self):
         super().__init__(name="Player", level=1, hp=100, atk=10, defp=10, acc=45, ev=35, wt=0, at=0, is_enemy=False)
         self.xp = 0
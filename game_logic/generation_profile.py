@@ -0,0 +1,78 @@
+import json
+import time
+
+class AttemptTimings:
+    def __init__(self, number):
+        self.number = number
+        self.phases = {}
+        self.started = time.perf_counter()
+        self.seconds = None
+        self.succeeded = None
+
+    def record(self, phase, seconds):
+        # phases are [calls, seconds] lists so a hot loop pays for one dict lookup and two adds
+        timing = self.phases.get(phase)
+        if timing is None:
+            self.phases[phase] = [1, seconds]
+        else:
+            timing[0] += 1
+            timing[1] += seconds
+
+    def finish(self, succeeded):
+        self.seconds = time.perf_counter() - self.started
+        self.succeeded = succeeded
+
+    def to_dict(self):
+        return {
+            "attempt": self.number,
+            "seconds": self.seconds,
+            "succeeded": self.succeeded,
+            "phases": {phase: {"calls": calls, "seconds": seconds} for phase, (calls, seconds) in self.phases.items()},
+        }
+
+class GenerationProfile:
+    def __init__(self):
+        self.attempts = []
+
+    def start_attempt(self):
+        attempt = AttemptTimings(len(self.attempts) + 1)
+        self.attempts.append(attempt)
+        return attempt
+
+    @property
+    def last_attempt(self):
+        return self.attempts[-1] if self.attempts else None
+
+    @property
+    def seconds(self):
+        return sum(attempt.seconds or 0 for attempt in self.attempts)
+
+    def totals(self):
+        totals = {}
+        for attempt in self.attempts:
+            for phase, (calls, seconds) in attempt.phases.items():
+                total = totals.setdefault(phase, [0, 0.0])
+                total[0] += calls
+                total[1] += seconds
+        return totals
+
+    def to_dict(self):
+        return {
+            "attempts": [attempt.to_dict() for attempt in self.attempts],
+            "seconds": self.seconds,
+            "totals": {phase: {"calls": calls, "seconds": seconds} for phase, (calls, seconds) in self.totals().items()},
+        }
+
+    def to_json(self, path=None):
+        report = json.dumps(self.to_dict(), indent=2)
+        if path:
+            with open(path, "w") as file:
+                file.write(report)
+        return report
+
+    def summary(self):
+        total = self.seconds or 1e-12
+        lines = [f"{len(self.attempts)} attempt(s), {self.seconds * 1000:.2f}ms"]
+        for phase, (calls, seconds) in sorted(self.totals().items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {phase:>30}: {seconds * 1000:9.2f}ms {seconds / total:6.1%} over {calls} call(s)")
+        return "\n".join(lines)
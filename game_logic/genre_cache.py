@@ -0,0 +1,109 @@
+import hashlib
+import logging
+import mmap
+import os
+import pickle
+import struct
+
+MAGIC = b"2DTG"
+VERSION = 1
+HEADER = struct.Struct("<4sHHqQ32sI")
+INDEX_ENTRY = struct.Struct("<QQH")
+
+def source_digest(json_path):
+    with open(json_path, "rb") as file:
+        return hashlib.sha256(file.read()).digest()
+
+class GenreCache:
+    # data.json split into one pickled shard per genre behind a name index; only the shards asked for are decoded
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.file = open(cache_path, "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.source_mtime, self.source_size, self.source_digest, genre_count = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{cache_path} is not a genre cache of version {VERSION}")
+        self.index = {}
+        offset = HEADER.size
+        for _ in range(genre_count):
+            shard_offset, shard_length, name_length = INDEX_ENTRY.unpack_from(self.buffer, offset)
+            offset += INDEX_ENTRY.size
+            name = self.buffer[offset:offset + name_length].decode("utf-8")
+            offset += name_length
+            self.index[name] = (shard_offset, shard_length)
+        self.names = list(self.index)
+        self.decoded = {}
+
+    @staticmethod
+    def path_for(json_path):
+        return f"{json_path}.cache"
+
+    @classmethod
+    def open(cls, json_path):
+        cache_path = cls.path_for(json_path)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            cache = cls(cache_path)
+        except (OSError, ValueError, struct.error) as e:
+            logging.error(f"Ignoring unreadable genre cache {cache_path}: {str(e)}")
+            return None
+        if cache.is_fresh(json_path):
+            return cache
+        cache.close()
+        return None
+
+    def is_fresh(self, json_path):
+        stat = os.stat(json_path)
+        if stat.st_mtime_ns == self.source_mtime and stat.st_size == self.source_size:
+            return True
+        # a touched but unchanged source keeps its cache; only the content hash decides
+        return stat.st_size == self.source_size and source_digest(json_path) == self.source_digest
+
+    @staticmethod
+    def build(json_path, data):
+        stat = os.stat(json_path)
+        shards = [(genre["genre"], pickle.dumps(genre, protocol=pickle.HIGHEST_PROTOCOL)) for genre in data.get("genres", [])]
+        encoded_names = [name.encode("utf-8") for name, _ in shards]
+        offset = HEADER.size + sum(INDEX_ENTRY.size + len(name) for name in encoded_names)
+        parts = [HEADER.pack(MAGIC, VERSION, 0, stat.st_mtime_ns, stat.st_size, source_digest(json_path), len(shards))]
+        for name, (_, shard) in zip(encoded_names, shards):
+            parts.append(INDEX_ENTRY.pack(offset, len(shard), len(name)))
+            parts.append(name)
+            offset += len(shard)
+        parts.extend(shard for _, shard in shards)
+        cache_path = GenreCache.path_for(json_path)
+        temp_path = f"{cache_path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(b"".join(parts))
+        os.replace(temp_path, cache_path)
+
+    def genre(self, name):
+        genre = self.decoded.get(name)
+        if genre is None:
+            shard_offset, shard_length = self.index[name]
+            genre = pickle.loads(self.buffer[shard_offset:shard_offset + shard_length])
+            self.decoded[name] = genre
+        return genre
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+class LazyGenres:
+    # stands in for data["genres"]: indexing decodes one shard, so random.choice touches a single genre
+    def __init__(self, cache):
+        self.cache = cache
+
+    def __len__(self):
+        return len(self.cache.names)
+
+    def __getitem__(self, index):
+        return self.cache.genre(self.cache.names[index])
+
+    def __iter__(self):
+        return (self.cache.genre(name) for name in self.cache.names)
+
+    def __repr__(self):
+        return f"LazyGenres({self.cache.names})"
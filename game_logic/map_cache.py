@@ -0,0 +1,48 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+
+class MapCache:
+    FORMAT_VERSION = 8
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.genre_digests = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def genre_digest(self, genre):
+        # content-address the genre itself, so editing data.json never serves a stale map
+        name = genre["genre"]
+        if name not in self.genre_digests:
+            encoded = json.dumps(genre, sort_keys=True).encode("utf-8")
+            self.genre_digests[name] = hashlib.sha256(encoded).hexdigest()
+        return self.genre_digests[name]
+
+    def key(self, genre, seed, grid_width, grid_height, player_level, placement_densities=None):
+        densities = sorted((placement_densities or {}).items())
+        parts = [self.FORMAT_VERSION, genre["genre"], self.genre_digest(genre), seed, grid_width, grid_height, player_level, densities]
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.map")
+
+    def load(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logging.error(f"Discarding unreadable cached map {path}: {str(e)}")
+            return None
+
+    def store(self, key, game_map):
+        path = self.path(key)
+        temp_path = f"{path}.tmp"
+        # write then rename, so a concurrent reader never sees half a map
+        with open(temp_path, "wb") as file:
+            pickle.dump(game_map, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
@@ -0,0 +1,197 @@
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from .game_logic import GameMap
+from .game_objects import Player
+import contextlib
+import functools
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+
+worker_data_loader = None
+worker_current_race = None
+
+def init_worker(json_path, current_race=None):
+    # one DataLoader per worker, so data.json is parsed once; imported here because data_loader imports this module
+    from .data_loader import DataLoader
+    global worker_data_loader, worker_current_race
+    worker_data_loader = DataLoader(json_path)
+    worker_current_race = current_race
+
+def warm_worker():
+    return os.getpid()
+
+def generate_pooled_map(genre_name, player_level, grid_width, grid_height):
+    worker_data_loader.select_genre(genre_name)
+    player = Player()
+    player.level = player_level
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_map = worker_data_loader.create_game_map(grid_width, grid_height, player=player)
+    if not game_map:
+        return None
+    return pickle.dumps(game_map, protocol=pickle.HIGHEST_PROTOCOL)
+
+def generate_candidate(race, genre_name, player_level, grid_width, grid_height, seed, placement_densities=None):
+    # a single generation attempt; the race itself stands in for DataLoader's serial retries.
+    # Once race `race` is decided the attempt gives up at the next phase boundary
+    def cancelled():
+        return worker_current_race.value != race
+    if cancelled():
+        return None
+    worker_data_loader.select_genre(genre_name)
+    player = Player()
+    player.level = player_level
+    rooms_data = worker_data_loader.genre["elements"]["rooms"]
+    game_map = GameMap(rooms_data, grid_width, grid_height, worker_data_loader, player=player, seed=seed, placement_densities=placement_densities)
+    with contextlib.redirect_stdout(io.StringIO()):
+        succeeded = game_map.generate_game_map(rooms_data, cancelled=cancelled)
+    if not succeeded or cancelled():
+        return None
+    return pickle.dumps(game_map, protocol=pickle.HIGHEST_PROTOCOL)
+
+def candidate_seed(seed, attempt):
+    digest = hashlib.sha256(repr((seed, attempt)).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+class SpeculativeGenerator:
+    def __init__(self, json_path, workers=None):
+        # no more workers than cores: past that the candidates only take turns on the same CPU
+        self.workers = workers or os.cpu_count() or 1
+        context = multiprocessing.get_context("spawn")
+        # the number of the race being run; workers poll it and drop candidates of a decided race
+        self.current_race = context.Value("q", 0, lock=False)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                            initializer=init_worker, initargs=(json_path, self.current_race))
+        # spawn the workers and load the game data now, so no race pays for it
+        for _ in range(self.workers):
+            self.executor.submit(warm_worker)
+
+    def race(self, genre_name, player_level, grid_width, grid_height, attempts=None, seed=None, placement_densities=None):
+        # returns (game_map or None, attempts that finished before the race was decided).
+        # Candidate seeds derive from `seed`, and the winner keeps its own seed in game_map.seed for replay
+        attempts = attempts or self.workers
+        base_seed = seed if seed is not None else int.from_bytes(os.urandom(8), "little")
+        race = self.current_race.value
+        futures = {self.executor.submit(generate_candidate, race, genre_name, player_level, grid_width, grid_height,
+                                        candidate_seed(base_seed, attempt), placement_densities): attempt for attempt in range(attempts)}
+        pending = set(futures)
+        consumed = 0
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    consumed += 1
+                    try:
+                        payload = future.result()
+                    except Exception as e:
+                        logging.error(f"Speculative attempt {futures[future]} failed: {str(e)}")
+                        continue
+                    if payload is not None:
+                        logging.info(f"Speculative attempt {futures[future]} won the race after {consumed} of {attempts} attempts")
+                        return pickle.loads(payload), consumed
+            return None, consumed
+        finally:
+            # queued losers never start, and running ones see the new race number at their next phase and stop
+            self.current_race.value = race + 1
+            for future in pending:
+                future.cancel()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class MapPool:
+    def __init__(self, json_path, grid_width=9, grid_height=9, depth=2, max_bytes=32 * 1024 * 1024, workers=1):
+        self.grid_size = (grid_width, grid_height)
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.genre_names = []
+        self.ready = defaultdict(deque)
+        self.pending = Counter()
+        self.pooled_bytes = 0
+        self.player_level = None
+        self.closed = False
+        self.lock = threading.Lock()
+        # spawn rather than fork: the parent runs a Qt event loop whose threads must not be cloned
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=init_worker, initargs=(json_path,))
+
+    def fill(self, genre_names, player_level=1):
+        self.genre_names = list(genre_names)
+        self.set_player_level(player_level)
+        for genre_name in self.genre_names:
+            self.refill(genre_name, player_level)
+
+    def set_player_level(self, player_level):
+        # maps are only ever taken for the player's current level, so a level change makes every other entry dead weight
+        with self.lock:
+            if player_level == self.player_level:
+                return
+            self.player_level = player_level
+            stale = [key for key in self.ready if key[1] != player_level]
+            for key in stale:
+                dropped = self.ready.pop(key)
+                self.pooled_bytes -= sum(len(payload) for payload in dropped)
+        if stale:
+            logging.info(f"Map pool dropped maps for {len(stale)} stale keys ({self.pooled_bytes} bytes left)")
+
+    def refill(self, genre_name, player_level):
+        key = (genre_name, player_level)
+        with self.lock:
+            if self.closed or self.pooled_bytes >= self.max_bytes:
+                return
+            missing = self.depth - len(self.ready[key]) - self.pending[key]
+            if missing <= 0:
+                return
+            self.pending[key] += missing
+        for _ in range(missing):
+            future = self.executor.submit(generate_pooled_map, genre_name, player_level, *self.grid_size)
+            future.add_done_callback(functools.partial(self.on_generated, key))
+
+    def on_generated(self, key, future):
+        with self.lock:
+            self.pending[key] -= 1
+        if future.cancelled():
+            return
+        try:
+            payload = future.result()
+        except Exception as e:
+            logging.error(f"Map pool worker failed for {key}: {str(e)}")
+            return
+        if payload is None:
+            logging.error(f"Map pool worker could not generate a map for {key}")
+            return
+        with self.lock:
+            if self.closed or self.pooled_bytes + len(payload) > self.max_bytes:
+                logging.info(f"Map pool is full, dropping a generated map for {key}")
+                return
+            if key[1] != self.player_level:
+                logging.info(f"Map pool dropping a map for {key}, the player has moved on to level {self.player_level}")
+                return
+            self.ready[key].append(payload)
+            self.pooled_bytes += len(payload)
+        logging.info(f"Map pool now holds {len(self.ready[key])} maps for {key} ({self.pooled_bytes} bytes in total)")
+
+    def take(self, genre_name, player_level):
+        key = (genre_name, player_level)
+        with self.lock:
+            queue = self.ready.get(key)
+            payload = queue.popleft() if queue else None
+            if payload is not None:
+                self.pooled_bytes -= len(payload)
+        # the next genre is picked at random, so every genre is topped up for the player's current level
+        self.fill(self.genre_names or [genre_name], player_level)
+        if payload is None:
+            logging.info(f"Map pool miss for {key}")
+            return None
+        return pickle.loads(payload)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.ready.clear()
+            self.pooled_bytes = 0
+        self.executor.shutdown(wait=False, cancel_futures=True)
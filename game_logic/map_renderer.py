@@ -0,0 +1,119 @@
+from .game_objects import EAST, SOUTH
+import numpy as np
+
+PLACEABLE_SYMBOLS = (("enemy", "E"), ("weapon", "W"), ("armor", "A"), ("key_item", "K"), ("lock_item", "L"), ("ally", "Y"))
+
+def room_symbol(room):
+    # a defeated enemy stays in its room but is no longer drawn
+    for attribute, symbol in PLACEABLE_SYMBOLS:
+        placeable = getattr(room, attribute)
+        if placeable and not getattr(placeable, "is_dead", False):
+            return symbol
+    return "X"
+
+class DeferredRender:
+    # logging only calls str() on a record it actually emits, so an unread map is never drawn
+    def __init__(self, render, *args, **kwargs):
+        self.render = render
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return self.render(*self.args, **self.kwargs)
+
+class MapRenderer:
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.canvas = None
+        self.window = None
+        self.graph_version = None
+        self.player_position = None
+
+    def bounds(self):
+        rooms = self.game_map.rooms
+        if not rooms:
+            return 0, 0, 0, 0
+        xs = [room.x for room in rooms]
+        ys = [room.y for room in rooms]
+        return min(xs), min(ys), max(xs) + 1, max(ys) + 1
+
+    def viewport(self, center, width, height):
+        if center is None:
+            return self.bounds()
+        left = center[0] - width // 2
+        top = center[1] - height // 2
+        return left, top, left + width, top + height
+
+    def player_room(self):
+        player = self.game_map.player
+        return player.current_room if player is not None else None
+
+    def render(self, center=None, width=40, height=20):
+        # center=None draws the whole map; otherwise a width x height window of rooms around center
+        window = self.viewport(center, width, height)
+        if self.canvas is None or window != self.window or self.graph_version != self.game_map.graph_version:
+            self.redraw(window)
+        else:
+            self.move_player()
+        return "\n".join(row.tobytes().decode("ascii") for row in self.canvas)
+
+    def redraw(self, window):
+        left, top, right, bottom = window
+        self.window = window
+        self.graph_version = self.game_map.graph_version
+        self.canvas = np.full((2 * (bottom - top), 2 * (right - left)), ord(" "), dtype=np.uint8)
+        room_dict = self.game_map.room_dict
+        for y in range(top, bottom):
+            for x in range(left, right):
+                room = room_dict.get((x, y))
+                if room is not None:
+                    self.draw_room(room)
+        self.player_position = None
+        self.move_player()
+
+    def cell(self, x, y):
+        left, top, right, bottom = self.window
+        if left <= x < right and top <= y < bottom:
+            return 2 * (y - top), 2 * (x - left)
+        return None
+
+    def draw_room(self, room):
+        row, column = self.cell(room.x, room.y)
+        self.canvas[row, column] = ord(room_symbol(room))
+        # each room draws its own east and south doors; north and west belong to the neighbour's cell
+        if room.connections & EAST and column + 1 < self.canvas.shape[1]:
+            self.canvas[row, column + 1] = ord("-")
+        if room.connections & SOUTH and row + 1 < self.canvas.shape[0]:
+            self.canvas[row + 1, column] = ord("|")
+
+    def refresh_room(self, room):
+        # for placeables picked up or defeated after the canvas was drawn
+        if self.canvas is not None and self.cell(room.x, room.y) is not None:
+            row, column = self.cell(room.x, room.y)
+            symbol = "P" if room is self.player_room() else room_symbol(room)
+            self.canvas[row, column] = ord(symbol)
+
+    def move_player(self):
+        room = self.player_room()
+        position = (room.x, room.y) if room is not None else None
+        if position == self.player_position:
+            return
+        if self.player_position is not None:
+            previous = self.game_map.room_dict.get(self.player_position)
+            if previous is not None and self.cell(previous.x, previous.y) is not None:
+                row, column = self.cell(previous.x, previous.y)
+                self.canvas[row, column] = ord(room_symbol(previous))
+        self.player_position = position
+        if room is not None and self.cell(room.x, room.y) is not None:
+            row, column = self.cell(room.x, room.y)
+            self.canvas[row, column] = ord("P")
+
+    def render_rooms(self, center=None, width=40, height=20):
+        left, top, right, bottom = self.viewport(center, width, height)
+        grid = np.full((bottom - top, right - left), ord(" "), dtype=np.uint8)
+        room_dict = self.game_map.room_dict
+        for y in range(top, bottom):
+            for x in range(left, right):
+                if room_dict.get((x, y)) is not None:
+                    grid[y - top, x - left] = ord("X")
+        return "\n".join(row.tobytes().decode("ascii") for row in grid)
@@ -0,0 +1,114 @@
+from collections import namedtuple
+from .game_objects import CONNECTION_COUNTS, EAST, SOUTH
+import logging
+import numpy as np
+
+ValidationResult = namedtuple("ValidationResult", ["components", "unreachable_rooms", "key_reachable", "lock_reachable"])
+POPCOUNT = np.array(CONNECTION_COUNTS, dtype=np.uint8)
+
+class DisjointSet:
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, item1, item2):
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+        if root1 == root2:
+            return False
+        if self.rank[root1] < self.rank[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        if self.rank[root1] == self.rank[root2]:
+            self.rank[root1] += 1
+        return True
+
+def component_labels(occupied, connections, width):
+    # min-label propagation along open connections until stable; empty cells stay -1
+    labels = np.where(occupied, np.arange(len(connections)), -1)
+    east_sources = np.flatnonzero((connections & EAST) != 0)
+    south_sources = np.flatnonzero((connections & SOUTH) != 0)
+    while True:
+        previous = labels.copy()
+        for sources, step in ((east_sources, 1), (south_sources, width)):
+            merged = np.minimum(labels[sources], labels[sources + step])
+            np.minimum.at(labels, sources, merged)
+            np.minimum.at(labels, sources + step, merged)
+        labels = labels[labels.clip(min=0)] * (labels >= 0) - (labels < 0)
+        if np.array_equal(labels, previous):
+            return labels
+
+class MapValidator:
+    def __init__(self, game_map):
+        self.game_map = game_map
+
+    def index(self, room):
+        return room.y * self.game_map.grid_width + room.x
+
+    def grid_arrays(self):
+        size = self.game_map.grid_width * self.game_map.grid_height
+        occupied = np.zeros(size, dtype=bool)
+        connections = np.zeros(size, dtype=np.uint8)
+        indexes = [self.index(room) for room in self.game_map.rooms]
+        occupied[indexes] = True
+        connections[indexes] = [room.connections for room in self.game_map.rooms]
+        return occupied, connections
+
+    def labels(self):
+        occupied, connections = self.grid_arrays()
+        return component_labels(occupied, connections, self.game_map.grid_width)
+
+    def validate(self):
+        labels = self.labels()
+        occupied_labels = labels[labels >= 0]
+        start = self.game_map.player_start_room or (self.game_map.rooms[0] if self.game_map.rooms else None)
+        if start is None:
+            return ValidationResult(0, 0, False, False)
+        start_label = labels[self.index(start)]
+        key_room = next((room for room in self.game_map.rooms if room.key_item), None)
+        lock_room = next((room for room in self.game_map.rooms if room.lock_item), None)
+        return ValidationResult(
+            components=len(np.unique(occupied_labels)),
+            unreachable_rooms=int(np.count_nonzero(occupied_labels != start_label)),
+            key_reachable=key_room is not None and bool(labels[self.index(key_room)] == start_label),
+            lock_reachable=lock_room is not None and bool(labels[self.index(lock_room)] == start_label),
+        )
+
+    def repair(self):
+        game_map = self.game_map
+        width = game_map.grid_width
+        occupied, connections = self.grid_arrays()
+        bridges = bridging_edges(occupied, connections, width)
+        for index1, index2 in bridges:
+            room1 = game_map.room_dict[(index1 % width, index1 // width)]
+            room2 = game_map.room_dict[(index2 % width, index2 // width)]
+            game_map.connect_rooms(room1, room2, game_map.calculate_direction(room1, room2))
+        if bridges:
+            logging.info(f"Map validator added {len(bridges)} bridging connections")
+        return len(bridges)
+
+def bridging_edges(occupied, connections, width):
+    # bridge components with the fewest possible doors, preferring the least crowded rooms on each side
+    labels = component_labels(occupied, connections, width)
+    columns = np.arange(len(labels)) % width
+    candidates = []
+    for step, bit, valid in ((1, EAST, columns < width - 1), (width, SOUTH, np.arange(len(labels)) < len(labels) - width)):
+        sources = np.flatnonzero(valid & occupied)
+        sources = sources[occupied[sources + step] & ((connections[sources] & bit) == 0)]
+        sources = sources[labels[sources] != labels[sources + step]]
+        candidates.append(np.stack([sources, sources + step]))
+    candidates = np.concatenate(candidates, axis=1)
+    if candidates.shape[1] == 0:
+        return []
+    crowding = POPCOUNT[connections[candidates[0]]].astype(np.int32) + POPCOUNT[connections[candidates[1]]]
+    order = np.lexsort((candidates[1], candidates[0], crowding))
+    components = DisjointSet(len(labels))
+    return [(index1, index2) for index1, index2 in candidates[:, order].T.tolist() if components.union(int(labels[index1]), int(labels[index2]))]
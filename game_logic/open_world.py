@@ -0,0 +1,123 @@
+from .game_logic import GameMap
+import hashlib
+import logging
+import pickle
+import random
+import zlib
+
+class OpenWorld(GameMap):
+    def __init__(self, rooms_data, data_loader, player=None, seed=None, chunk_size=9, border_margin=2, keep_radius=2, seam_doors=2):
+        super().__init__(rooms_data, chunk_size, chunk_size, data_loader, player=player, seed=seed)
+        self.world_seed = seed if seed is not None else random.randrange(2**32)
+        self.chunk_size = chunk_size
+        self.border_margin = border_margin
+        self.keep_radius = keep_radius
+        self.seam_doors = seam_doors
+        # the world is unbounded; room_dict only ever holds the rooms of loaded chunks
+        self.room_dict = {}
+        self.rooms = []
+        self.chunks = {}
+        self.evicted_chunks = {}
+
+    def chunk_of(self, x, y):
+        return x // self.chunk_size, y // self.chunk_size
+
+    def chunk_seed(self, chunk):
+        digest = hashlib.sha256(repr((self.world_seed, chunk)).encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "little")
+
+    def start(self):
+        self.load_chunk((0, 0))
+        start_room = self.chunks[(0, 0)].player_start_room
+        self.set_player_start_room(start_room)
+        self.rooms.remove(start_room)
+        self.rooms.insert(0, start_room)
+        return start_room
+
+    def on_player_moved(self, room):
+        chunk = self.chunk_of(room.x, room.y)
+        self.load_chunk(chunk)
+        local_x = room.x - chunk[0] * self.chunk_size
+        local_y = room.y - chunk[1] * self.chunk_size
+        near_west = local_x < self.border_margin
+        near_east = local_x >= self.chunk_size - self.border_margin
+        near_north = local_y < self.border_margin
+        near_south = local_y >= self.chunk_size - self.border_margin
+        dxs = [0] + ([-1] if near_west else []) + ([1] if near_east else [])
+        dys = [0] + ([-1] if near_north else []) + ([1] if near_south else [])
+        for dx in dxs:
+            for dy in dys:
+                self.load_chunk((chunk[0] + dx, chunk[1] + dy))
+        self.evict_distant_chunks(chunk)
+
+    def load_chunk(self, chunk):
+        if chunk in self.chunks:
+            return
+        if chunk in self.evicted_chunks:
+            chunk_map = pickle.loads(zlib.decompress(self.evicted_chunks.pop(chunk)))
+            logging.info(f"Restored chunk {chunk} from its serialized form")
+        else:
+            chunk_map = self.generate_chunk(chunk)
+        self.chunks[chunk] = chunk_map
+        for room in chunk_map.rooms:
+            self.room_dict[(room.x, room.y)] = room
+            room.room_grid = self.room_dict
+            self.rooms.append(room)
+        self.graph_version += 1
+        self.connect_seams(chunk)
+
+    def generate_chunk(self, chunk):
+        chunk_map = GameMap(self.rooms_data, self.chunk_size, self.chunk_size, self.data_loader, player=self.player, seed=self.chunk_seed(chunk))
+        for _ in range(5):
+            if chunk_map.generate_game_map(self.rooms_data):
+                break
+        else:
+            raise Exception(f"Failed to generate chunk {chunk}")
+        offset_x = chunk[0] * self.chunk_size
+        offset_y = chunk[1] * self.chunk_size
+        for room in chunk_map.rooms:
+            room.x += offset_x
+            room.y += offset_y
+        chunk_map.room_dict = {(room.x, room.y): room for room in chunk_map.rooms}
+        logging.info(f"Generated chunk {chunk}")
+        return chunk_map
+
+    def connect_seams(self, chunk):
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            neighbour = (chunk[0] + dx, chunk[1] + dy)
+            if neighbour not in self.chunks:
+                continue
+            border_pairs = []
+            for room in self.chunks[chunk].rooms:
+                other = self.room_dict.get((room.x + dx, room.y + dy))
+                if other is not None and self.chunk_of(other.x, other.y) == neighbour:
+                    border_pairs.append((room, other))
+            if any(self.is_connected(room, other) for room, other in border_pairs):
+                continue
+            # seam doors depend only on the pair of chunks, so the world comes out the same in any load order
+            seam_rng = random.Random(self.chunk_seed(tuple(sorted((chunk, neighbour)))))
+            border_pairs.sort(key=lambda pair: min((pair[0].x, pair[0].y), (pair[1].x, pair[1].y)))
+            seam_rng.shuffle(border_pairs)
+            doors = 0
+            for room, other in border_pairs:
+                if doors >= self.seam_doors:
+                    break
+                if self.can_connect_rooms(room, other):
+                    self.connect_rooms(room, other, self.calculate_direction(room, other))
+                    doors += 1
+
+    def evict_distant_chunks(self, player_chunk):
+        for chunk in list(self.chunks):
+            if max(abs(chunk[0] - player_chunk[0]), abs(chunk[1] - player_chunk[1])) > self.keep_radius:
+                self.evict_chunk(chunk)
+
+    def evict_chunk(self, chunk):
+        chunk_map = self.chunks.pop(chunk)
+        evicted = set((room.x, room.y) for room in chunk_map.rooms)
+        # seam bits stay set on both sides; a loaded room just resolves its evicted neighbour to None until it comes back
+        for position in evicted:
+            self.room_dict.pop(position)
+        self.rooms = [room for room in self.rooms if (room.x, room.y) not in evicted]
+        self.graph_version += 1
+        self.evicted_chunks[chunk] = zlib.compress(pickle.dumps(chunk_map, protocol=pickle.HIGHEST_PROTOCOL))
+        logging.info(f"Evicted chunk {chunk} ({len(self.evicted_chunks[chunk])} bytes)")
@@ -0,0 +1,82 @@
+from collections import OrderedDict, deque
+import numpy as np
+
+class RoomGraph:
+    def __init__(self, game_map, max_cached_fields=256):
+        self.game_map = game_map
+        self.max_cached_fields = max_cached_fields
+        # least recently used first, so eviction drops the field that has gone unused the longest
+        self.distance_fields = OrderedDict()
+        self.graph_version = game_map.graph_version
+
+    def check_version(self):
+        # any connect_rooms call (or chunk load/evict) bumps the map's version and drops every cached field
+        if self.graph_version != self.game_map.graph_version:
+            self.distance_fields.clear()
+            self.graph_version = self.game_map.graph_version
+
+    def distance_field(self, source):
+        self.check_version()
+        position = (source.x, source.y)
+        field = self.distance_fields.get(position)
+        if field is None:
+            field = self.breadth_first(source)
+            if len(self.distance_fields) >= self.max_cached_fields:
+                self.distance_fields.popitem(last=False)
+            self.distance_fields[position] = field
+        else:
+            self.distance_fields.move_to_end(position)
+        return field
+
+    def breadth_first(self, source):
+        field = {(source.x, source.y): 0}
+        queue = deque([source])
+        while queue:
+            room = queue.popleft()
+            distance = field[(room.x, room.y)] + 1
+            for neighbour in room.get_adjacent_rooms():
+                position = (neighbour.x, neighbour.y)
+                if position not in field:
+                    field[position] = distance
+                    queue.append(neighbour)
+        return field
+
+    def distance(self, room1, room2):
+        return self.distance_field(room2).get((room1.x, room1.y))
+
+    def shortest_path(self, start, goal):
+        # walk downhill through the goal's distance field, so repeated routes to one goal share a single BFS.
+        # The field follows the doors out of the goal; if a door is missing on the way back, there is no path
+        field = self.distance_field(goal)
+        distance = field.get((start.x, start.y))
+        if distance is None:
+            return None
+        path = [start]
+        room = start
+        while distance > 0:
+            distance -= 1
+            room = next((neighbour for neighbour in room.get_adjacent_rooms() if field.get((neighbour.x, neighbour.y)) == distance), None)
+            if room is None:
+                return None
+            path.append(room)
+        return path
+
+    def nearest(self, source, predicate):
+        # fields are filled in BFS order, so the first match is the nearest one
+        for position, distance in self.distance_field(source).items():
+            room = self.game_map.room_dict.get(position)
+            if room is not None and room is not source and predicate(room):
+                return room, distance
+        return None, None
+
+    def all_pairs_distances(self, max_rooms=2048):
+        rooms = self.game_map.rooms
+        if len(rooms) > max_rooms:
+            raise ValueError(f"All-pairs distances are limited to {max_rooms} rooms, this map has {len(rooms)}")
+        index = {(room.x, room.y): i for i, room in enumerate(rooms)}
+        distances = np.full((len(rooms), len(rooms)), -1, dtype=np.int32)
+        for i, room in enumerate(rooms):
+            for position, distance in self.breadth_first(room).items():
+                if position in index:
+                    distances[i, index[position]] = distance
+        return distances
@@ -0,0 +1,293 @@
+from .map_validator import DisjointSet, bridging_edges, component_labels
+from .text_engine import compile_text_engine
+from .game_objects import Armor, Character, DIRECTION_BITS, EAST, Key, Lock, NORTH, OFFSET_BITS, OPPOSITE_BITS, Room, SOUTH, WEST, Weapon
+import itertools
+import logging
+import numpy as np
+import random
+
+EMPTY, KEY, LOCK, WEAPON, ARMOR, ENEMY, ALLY = range(7)
+OCCUPANT_ATTRIBUTES = {KEY: "key_item", LOCK: "lock_item", WEAPON: "weapon", ARMOR: "armor", ENEMY: "enemy", ALLY: "ally"}
+OCCUPANT_SYMBOLS = np.array([ord(symbol) for symbol in "XKLWAEY"], dtype=np.uint8)
+# when a room holds more than one placeable, the occupant code is the one MapRenderer would draw
+OCCUPANT_PRIORITY = (ENEMY, WEAPON, ARMOR, KEY, LOCK, ALLY)
+CONNECTION_COUNTS = np.array([bin(mask).count("1") for mask in range(16)], dtype=np.uint8)
+
+class RoomGrid:
+    def __init__(self, rooms_data, grid_width, grid_height, data_loader, player=None, seed=None):
+        self.rooms_data = rooms_data
+        self.room_types = [data["type"] for data in rooms_data]
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.data_loader = data_loader
+        self.player = player
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.np_rng = np.random.default_rng(self.seed)
+        size = grid_width * grid_height
+        self.room_type_ids = np.full(size, -1, dtype=np.int16)
+        self.cluster_ids = np.full(size, -1, dtype=np.int32)
+        self.connections = np.zeros(size, dtype=np.uint8)
+        self.occupants = np.zeros(size, dtype=np.uint8)
+        self.max_connections = np.full(size, 4, dtype=np.uint8)
+        # cell index -> {room attribute: placeable}; a room can end up holding an ally next to an item
+        self.occupant_objects = {}
+        self.graph_version = 0
+        self.materialized_rooms = {}
+        self.player_start_index = None
+        self.text_tables = compile_text_engine(rooms_data, data_loader.genre["genre"] if data_loader.genre else None).tables
+
+    def index(self, x, y):
+        return y * self.grid_width + x
+
+    def position(self, index):
+        return index % self.grid_width, index // self.grid_width
+
+    def is_position_in_map(self, position):
+        x, y = position
+        return 0 <= x < self.grid_width and 0 <= y < self.grid_height
+
+    def generate(self):
+        size = self.grid_width * self.grid_height
+        free = list(range(size))
+        self.rng.shuffle(free)
+        free_slot = [0] * size
+        for slot, index in enumerate(free):
+            free_slot[index] = slot
+        claimed = bytearray(size)
+        insertion_order = []
+
+        def claim(index, type_id, cluster_id, max_connections=4):
+            claimed[index] = 1
+            self.max_connections[index] = max_connections
+            self.room_type_ids[index] = type_id
+            self.cluster_ids[index] = cluster_id
+            insertion_order.append(index)
+            slot = free_slot[index]
+            last = free.pop()
+            if last != index:
+                free[slot] = last
+                free_slot[last] = slot
+
+        type_ids = list(range(len(self.room_types)))
+        self.rng.shuffle(type_ids)
+        type_cycle = itertools.cycle(type_ids)
+        in_frontier = bytearray(size)
+        cluster_id = 0
+        while free:
+            type_id = next(type_cycle)
+            if cluster_id == 0:
+                start = self.index(self.grid_width // 2, self.grid_height // 2)
+            else:
+                start = self.rng.choice(free)
+            # GameMap.create_cluster's limits: one door out of the start cluster's root, two out of every other root
+            claim(start, type_id, cluster_id, 1 if cluster_id == 0 else 2)
+            frontier = self.free_neighbours(start, claimed, in_frontier)
+            rooms_in_cluster = 1
+            cluster_target = self.rng.randint(7, 10)
+            while frontier and rooms_in_cluster < cluster_target:
+                position = frontier.pop(self.rng.randrange(len(frontier)))
+                in_frontier[position] = 0
+                claim(position, type_id, cluster_id)
+                rooms_in_cluster += 1
+                frontier.extend(self.free_neighbours(position, claimed, in_frontier))
+            for position in frontier:
+                in_frontier[position] = 0
+            cluster_id += 1
+        self.connect_clusters(np.array(insertion_order, dtype=np.int64))
+        self.repair()
+        cluster_zero = np.flatnonzero(self.cluster_ids == 0)
+        self.player_start_index = int(self.np_rng.choice(cluster_zero))
+        self.add_placeables(enemy_count=3)
+        logging.info(f"Generated room grid {self.grid_width}x{self.grid_height} with {cluster_id} clusters")
+        return True
+
+    def free_neighbours(self, index, claimed, in_frontier):
+        x, y = self.position(index)
+        neighbours = []
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.grid_width and 0 <= ny < self.grid_height:
+                neighbour = self.index(nx, ny)
+                if not claimed[neighbour] and not in_frontier[neighbour]:
+                    in_frontier[neighbour] = 1
+                    neighbours.append(neighbour)
+        self.rng.shuffle(neighbours)
+        return neighbours
+
+    def connect_clusters(self, insertion_order):
+        # GameMap.connect_clusters over the arrays: every east/south neighbour pair that can_connect_rooms allows,
+        # sorted by connection counts (stably, so in room insertion order, east before south), joined wherever it
+        # links two components. GameMap's per-room helpers (_connect_to_existing_room, _connect_room_to_surroundings)
+        # walk get_adjacent_rooms, which only yields rooms that are already connected, so they never add a door and
+        # connect_clusters is where the whole topology comes from; likewise max_connections only screens the
+        # candidates, as can_connect_rooms does, and connect_rooms itself does not recheck it
+        width = self.grid_width
+        occupied = self.room_type_ids >= 0
+        counts = CONNECTION_COUNTS[self.connections]
+        x = insertion_order % width
+        y = insertion_order // width
+        sources, targets, southward = [], [], []
+        for step, bit, valid in ((1, EAST, x + 1 < width), (width, SOUTH, y + 1 < self.grid_height)):
+            source = insertion_order[valid]
+            target = source + step
+            source, target = source[occupied[target]], target[occupied[target]]
+            open_pair = ((self.connections[source] & bit) == 0) & (counts[source] < self.max_connections[source]) & (counts[target] < self.max_connections[target])
+            sources.append(source[open_pair])
+            targets.append(target[open_pair])
+            southward.append(np.full(int(open_pair.sum()), bit == SOUTH))
+        sources, targets, southward = np.concatenate(sources), np.concatenate(targets), np.concatenate(southward)
+        rank = np.empty(len(self.connections), dtype=np.int64)
+        rank[insertion_order] = np.arange(len(insertion_order))
+        order = np.lexsort((southward, rank[sources], counts[targets], counts[sources]))
+        components = DisjointSet(len(self.connections))
+        for source, target, is_south in zip(sources[order].tolist(), targets[order].tolist(), southward[order].tolist()):
+            if components.union(source, target):
+                self.link(source, target, SOUTH if is_south else EAST)
+
+    def repair(self):
+        bridges = bridging_edges(self.room_type_ids >= 0, self.connections, self.grid_width)
+        for source, target in bridges:
+            self.link(source, target, EAST if target // self.grid_width == source // self.grid_width else SOUTH)
+        return len(bridges)
+
+    def link(self, source, target, bit):
+        self.connections[source] |= bit
+        self.connections[target] |= OPPOSITE_BITS[bit]
+        for index, mask in ((source, bit), (target, OPPOSITE_BITS[bit])):
+            room = self.materialized_rooms.get(index)
+            if room is not None:
+                room.connections |= mask
+        self.graph_version += 1
+
+    def add_placeables(self, enemy_count):
+        elements = self.data_loader.genre["elements"]
+        level = self.player.level if self.player else 1
+        start_level_diff = max(1, level - 5)
+        end_level_diff = level + 5
+        level_diffs = list(range(start_level_diff, end_level_diff))
+        full_weights = [6 - abs(i) for i in range(-5, 6)]
+        weights = np.array(full_weights[(start_level_diff - 1):(end_level_diff - 1)], dtype=float)
+        levels = self.np_rng.choice(level_diffs, size=enemy_count + 1, p=weights / weights.sum())
+        stats = self.data_loader.stat_tables()
+        puzzle = self.rng.choice(elements["puzzle_items"])
+        weapon = self.rng.randrange(len(stats.weapons))
+        armor = self.rng.randrange(len(stats.armor))
+        placeables = [
+            (KEY, Key(puzzle["key_item"], puzzle["lock_item"])),
+            (LOCK, Lock(puzzle["lock_item"], puzzle["key_item"])),
+            (WEAPON, Weapon(stats.weapons.names[weapon], *stats.weapons.row(weapon))),
+            (ARMOR, Armor(stats.armor.names[armor], *stats.armor.row(armor))),
+        ]
+        for i, character_level in enumerate(levels.tolist()):
+            row = self.rng.randrange(len(stats.characters))
+            is_enemy = i < enemy_count
+            character = Character(stats.characters.names[row], character_level, *stats.characters.row(row), 0, 0, is_enemy, rng=self.rng)
+            placeables.append((ENEMY if is_enemy else ALLY, character))
+        candidates = np.flatnonzero(np.arange(len(self.occupants)) != self.player_start_index)
+        if len(candidates) < len(placeables):
+            raise Exception("Not enough rooms for all placeable items!")
+        for index, (code, placeable) in zip(self.np_rng.choice(candidates, size=len(placeables), replace=False).tolist(), placeables):
+            self.occupants[index] = code
+            self.occupant_objects[index] = {OCCUPANT_ATTRIBUTES[code]: placeable}
+
+    def room_at(self, x, y):
+        if not self.is_position_in_map((x, y)):
+            return None
+        index = self.index(x, y)
+        if self.room_type_ids[index] < 0:
+            return None
+        room = self.materialized_rooms.get(index)
+        if room is None:
+            room = self.materialize(index)
+            self.materialized_rooms[index] = room
+        return room
+
+    def materialize(self, index):
+        # names are derived from (seed, cell) so a room reads the same however often it is evicted and rebuilt
+        x, y = self.position(index)
+        picker = random.Random(self.seed * 1000003 + index)
+        adjective = picker.choice(self.text_tables["adjectives"].fragments)
+        name = picker.choice(self.text_tables["name"].fragments)
+        description = (picker.choice(self.text_tables["scenery"].fragments), picker.choice(self.text_tables["atmosphere"].fragments))
+        room = Room(self.room_types[self.room_type_ids[index]], (adjective, name), description, x, y,
+                    max_connections=int(self.max_connections[index]), cluster_id=int(self.cluster_ids[index]))
+        room.connections = int(self.connections[index])
+        room.room_grid = self
+        for attribute, placeable in self.occupant_objects.get(index, {}).items():
+            setattr(room, attribute, placeable)
+            placeable.current_room = room
+        return room
+
+    def store(self, room):
+        # a materialized room is a copy; this writes its doors and placeables back into the arrays
+        index = self.index(room.x, room.y)
+        if int(self.connections[index]) != room.connections:
+            self.connections[index] = room.connections
+            self.graph_version += 1
+        occupants = {OCCUPANT_ATTRIBUTES[code]: getattr(room, OCCUPANT_ATTRIBUTES[code]) for code in OCCUPANT_PRIORITY if getattr(room, OCCUPANT_ATTRIBUTES[code])}
+        if occupants:
+            self.occupant_objects[index] = occupants
+        else:
+            self.occupant_objects.pop(index, None)
+        # the drawn code skips a defeated enemy, as MapRenderer's room_symbol does
+        self.occupants[index] = next((code for code in OCCUPANT_PRIORITY if OCCUPANT_ATTRIBUTES[code] in occupants
+                                      and not getattr(occupants[OCCUPANT_ATTRIBUTES[code]], "is_dead", False)), EMPTY)
+
+    def get(self, position):
+        # lets materialized rooms resolve their neighbours through the grid like they would through GameMap.room_dict
+        return self.room_at(*position)
+
+    def release_rooms(self):
+        for room in self.materialized_rooms.values():
+            self.store(room)
+        self.materialized_rooms.clear()
+
+    # the rest of the GameMap interface the GUI relies on
+    def connect_rooms(self, room1, room2, direction):
+        bit = OFFSET_BITS.get((room2.x - room1.x, room2.y - room1.y))
+        if bit is None or bit != DIRECTION_BITS[direction] or self.connections[self.index(room1.x, room1.y)] & bit:
+            return False
+        self.link(self.index(room1.x, room1.y), self.index(room2.x, room2.y), bit)
+        return True
+
+    def on_player_moved(self, room):
+        pass
+
+    def placeables_changed(self, *rooms):
+        for room in rooms:
+            self.store(room)
+
+    @property
+    def player_start_room(self):
+        return self.room_at(*self.position(self.player_start_index))
+
+    @property
+    def rooms(self):
+        # materializes every room; meant for small maps and the GUI, not for 100k-cell grids.
+        # The start room comes first, since the GUI puts the player in rooms[0]
+        indexes = np.flatnonzero(self.room_type_ids >= 0).tolist()
+        if self.player_start_index is not None:
+            indexes.remove(self.player_start_index)
+            indexes.insert(0, self.player_start_index)
+        return [self.room_at(*self.position(index)) for index in indexes]
+
+    def connection_counts(self):
+        return CONNECTION_COUNTS[self.connections].reshape(self.grid_height, self.grid_width)
+
+    def component_labels(self):
+        labels = component_labels(self.room_type_ids >= 0, self.connections, self.grid_width)
+        return labels.reshape(self.grid_height, self.grid_width)
+
+    def render(self):
+        canvas = np.full((2 * self.grid_height, 2 * self.grid_width), ord(" "), dtype=np.uint8)
+        occupied = (self.room_type_ids >= 0).reshape(self.grid_height, self.grid_width)
+        symbols = OCCUPANT_SYMBOLS[self.occupants].reshape(self.grid_height, self.grid_width)
+        rooms = canvas[0::2, 0::2]
+        rooms[occupied] = symbols[occupied]
+        if self.player and self.player.current_room is not None:
+            rooms[self.player.current_room.y, self.player.current_room.x] = ord("P")
+        connections = self.connections.reshape(self.grid_height, self.grid_width)
+        canvas[1::2, 0::2][(connections & SOUTH) != 0] = ord("|")
+        canvas[0::2, 1::2][(connections & EAST) != 0] = ord("-")
+        return "\n".join(row.tobytes().decode("ascii") for row in canvas)
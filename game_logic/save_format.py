@@ -0,0 +1,282 @@
+from .game_logic import GameMap
+from .game_objects import Armor, Character, Healing, Key, Lock, Player, Room, Weapon
+import mmap
+import numpy as np
+import os
+import struct
+
+MAGIC = b"2DTA"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIiIIIQQQQQd")
+NO_STRING = 0xFFFFFFFF
+ROOM_DTYPE = np.dtype([("x", "<i4"), ("y", "<i4"), ("type", "<u4"), ("name", "<u4", (2,)), ("description", "<u4", (2,)),
+                       ("cluster_id", "<i4"), ("connections", "u1"), ("max_connections", "u1"), ("present", "u1"), ("pad", "u1")])
+ENTITY_DTYPE = np.dtype([("kind", "u1"), ("owner", "u1"), ("flags", "u1"), ("pad", "u1"), ("room", "<i4"), ("name", "<u4"),
+                         ("text", "<u4"), ("stats", "<i4", (10,))])
+KEY, LOCK, WEAPON, ARMOR, HEALING, ENEMY, ALLY, PLAYER = range(8)
+IN_ROOM, IN_INVENTORY = range(2)
+EQUIPPED_WEAPON, EQUIPPED_ARMOR, PLAYER_KEY, PLAYER_ALLY = 1, 2, 4, 8
+ROOM_ATTRIBUTES = {KEY: "key_item", LOCK: "lock_item", WEAPON: "weapon", ARMOR: "armor", ENEMY: "enemy", ALLY: "ally"}
+CHARACTER_STATS = ("level", "hp", "atk", "defp", "acc", "ev", "weapon_tier", "armor_tier", "is_enemy", "is_dead")
+
+def align(offset):
+    return (offset + 7) & ~7
+
+class StringTable:
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def add(self, text):
+        if text is None:
+            return NO_STRING
+        if text not in self.index:
+            self.index[text] = len(self.strings)
+            self.strings.append(text)
+        return self.index[text]
+
+    def add_parts(self, parts):
+        # rooms keep at most two shared fragments; anything longer is stored joined
+        if len(parts) > 2:
+            parts = (" ".join(parts),)
+        return [self.add(part) for part in parts] + [NO_STRING] * (2 - len(parts))
+
+    def encode(self):
+        blob = bytearray()
+        offsets = [0]
+        for text in self.strings:
+            blob += text.encode("utf-8")
+            offsets.append(len(blob))
+        return np.array(offsets, dtype="<u4").tobytes(), bytes(blob)
+
+def character_record(record, character, strings, kind, owner, room_index, flags=0):
+    record["kind"] = kind
+    record["owner"] = owner
+    record["flags"] = flags
+    record["room"] = room_index
+    record["name"] = strings.add(character.name)
+    record["text"] = NO_STRING
+    record["stats"] = [int(getattr(character, stat)) for stat in CHARACTER_STATS]
+
+def item_record(record, item, strings, owner, room_index, flags=0):
+    record["owner"] = owner
+    record["flags"] = flags
+    record["room"] = room_index
+    record["name"] = strings.add(item.name)
+    record["text"] = NO_STRING
+    stats = [0] * 10
+    if isinstance(item, Key):
+        record["kind"] = KEY
+        record["text"] = strings.add(item.unlock_room)
+    elif isinstance(item, Lock):
+        record["kind"] = LOCK
+        record["text"] = strings.add(item.locked_room)
+    elif isinstance(item, Weapon):
+        record["kind"] = WEAPON
+        stats[:2] = [item.damage, item.accuracy]
+    elif isinstance(item, Armor):
+        record["kind"] = ARMOR
+        stats[:2] = [item.defense, item.evasion]
+    elif isinstance(item, Healing):
+        record["kind"] = HEALING
+        stats[0] = item.hp
+    record["stats"] = stats
+
+def save_game(path, game_map, player, genre_name):
+    width, height = game_map.grid_width, game_map.grid_height
+    strings = StringTable()
+    rooms = np.zeros(width * height, dtype=ROOM_DTYPE)
+    order = np.zeros(len(game_map.rooms), dtype="<u4")
+    entities = []
+    for i, room in enumerate(game_map.rooms):
+        index = room.y * width + room.x
+        order[i] = index
+        record = rooms[index]
+        record["x"], record["y"] = room.x, room.y
+        record["type"] = strings.add(room.type)
+        record["name"] = strings.add_parts(room.name_parts)
+        record["description"] = strings.add_parts(room.description_parts)
+        record["cluster_id"] = room.cluster_id if room.cluster_id is not None else -1
+        record["connections"] = room.connections
+        record["max_connections"] = room.max_connections
+        record["present"] = 1
+        for kind, attribute in ROOM_ATTRIBUTES.items():
+            placeable = getattr(room, attribute)
+            if placeable is None:
+                continue
+            entity = np.zeros((), dtype=ENTITY_DTYPE)
+            if kind in (ENEMY, ALLY):
+                flags = PLAYER_ALLY if placeable is player.ally else 0
+                character_record(entity, placeable, strings, kind, IN_ROOM, index, flags)
+            else:
+                item_record(entity, placeable, strings, IN_ROOM, index)
+            entities.append(entity)
+        for item in room.items:
+            entity = np.zeros((), dtype=ENTITY_DTYPE)
+            item_record(entity, item, strings, IN_ROOM, index)
+            entities.append(entity)
+    current_room = player.current_room
+    entity = np.zeros((), dtype=ENTITY_DTYPE)
+    character_record(entity, player, strings, PLAYER, IN_INVENTORY, current_room.y * width + current_room.x if current_room else -1)
+    entities.append(entity)
+    for item in player.inventory:
+        flags = (EQUIPPED_WEAPON if item is player.weapon else 0) | (EQUIPPED_ARMOR if item is player.armor else 0) | (PLAYER_KEY if item is player.key else 0)
+        entity = np.zeros((), dtype=ENTITY_DTYPE)
+        item_record(entity, item, strings, IN_INVENTORY, -1, flags)
+        entities.append(entity)
+    entity_array = np.array(entities, dtype=ENTITY_DTYPE) if entities else np.zeros(0, dtype=ENTITY_DTYPE)
+    genre_index = strings.add(genre_name)
+    start = game_map.player_start_room
+    start_index = start.y * width + start.x if start else -1
+    offsets_bytes, blob = strings.encode()
+    rooms_offset = align(HEADER.size)
+    order_offset = align(rooms_offset + rooms.nbytes)
+    entities_offset = align(order_offset + order.nbytes)
+    strings_offset = align(entities_offset + entity_array.nbytes)
+    blob_offset = align(strings_offset + len(offsets_bytes))
+    header = HEADER.pack(MAGIC, VERSION, 0, width, height, genre_index, start_index, len(order), len(entity_array), len(strings.strings),
+                         rooms_offset, order_offset, entities_offset, strings_offset, blob_offset, float(player.xp))
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        for offset, payload in ((0, header), (rooms_offset, rooms.tobytes()), (order_offset, order.tobytes()),
+                                (entities_offset, entity_array.tobytes()), (strings_offset, offsets_bytes), (blob_offset, blob)):
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(payload)
+    os.replace(temp_path, path)
+
+class SaveFile:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.grid_width, self.grid_height, genre_index, self.player_start_index, room_count, entity_count,
+         string_count, rooms_offset, order_offset, entities_offset, strings_offset, blob_offset, self.player_xp) = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a saved game")
+        if version != VERSION:
+            raise ValueError(f"Unsupported save version {version}")
+        # every section is a zero-copy view into the mapping; pages are only read when a record is touched
+        self.room_records = np.frombuffer(self.buffer, dtype=ROOM_DTYPE, count=self.grid_width * self.grid_height, offset=rooms_offset)
+        self.room_order = np.frombuffer(self.buffer, dtype="<u4", count=room_count, offset=order_offset)
+        self.entity_records = np.frombuffer(self.buffer, dtype=ENTITY_DTYPE, count=entity_count, offset=entities_offset)
+        self.string_offsets = np.frombuffer(self.buffer, dtype="<u4", count=string_count + 1, offset=strings_offset)
+        self.blob_offset = blob_offset
+        self.decoded_strings = {}
+        self.genre_name = self.string(genre_index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.room_records = self.room_order = self.entity_records = self.string_offsets = None
+        self.buffer.close()
+        self.file.close()
+
+    def string(self, index):
+        if index == NO_STRING:
+            return None
+        text = self.decoded_strings.get(index)
+        if text is None:
+            start = self.blob_offset + int(self.string_offsets[index])
+            end = self.blob_offset + int(self.string_offsets[index + 1])
+            text = self.buffer[start:end].decode("utf-8")
+            self.decoded_strings[index] = text
+        return text
+
+    def parts(self, indexes):
+        return tuple(self.string(int(index)) for index in indexes if index != NO_STRING)
+
+    def room_at(self, x, y):
+        if not (0 <= x < self.grid_width and 0 <= y < self.grid_height):
+            return None
+        record = self.room_records[y * self.grid_width + x]
+        if not record["present"]:
+            return None
+        return self.build_room(record)
+
+    def build_room(self, record):
+        room = Room(self.string(int(record["type"])), self.parts(record["name"]), self.parts(record["description"]), int(record["x"]), int(record["y"]),
+                    max_connections=int(record["max_connections"]), cluster_id=int(record["cluster_id"]) if record["cluster_id"] >= 0 else None)
+        room.connections = int(record["connections"])
+        return room
+
+    def build_character(self, record, cls):
+        # bypass __init__, which would reroll stats and redecorate the name
+        character = cls.__new__(cls)
+        character.name = self.string(int(record["name"]))
+        for stat, value in zip(CHARACTER_STATS, record["stats"].tolist()):
+            setattr(character, stat, bool(value) if stat in ("is_enemy", "is_dead") else value)
+        character.weapon = None
+        character.armor = None
+        character.inventory = []
+        character.current_room = None
+        character.x = 0
+        character.y = 0
+        character.ally = None
+        return character
+
+    def build_item(self, record):
+        kind = int(record["kind"])
+        name = self.string(int(record["name"]))
+        stats = record["stats"].tolist()
+        if kind == KEY:
+            return Key(name, self.string(int(record["text"])))
+        if kind == LOCK:
+            return Lock(name, self.string(int(record["text"])))
+        if kind == WEAPON:
+            return Weapon(name, stats[0], stats[1])
+        if kind == ARMOR:
+            return Armor(name, stats[0], stats[1])
+        return Healing(name, stats[0])
+
+    def restore(self, data_loader):
+        data_loader.select_genre(self.genre_name)
+        player = None
+        player_room_index = -1
+        for record in self.entity_records:
+            if record["kind"] == PLAYER:
+                player = self.build_character(record, Player)
+                player.xp = self.player_xp
+                player.key = None
+                player_room_index = int(record["room"])
+        game_map = GameMap(data_loader.genre["elements"]["rooms"], self.grid_width, self.grid_height, data_loader, player=player)
+        game_map.positions = []
+        game_map.position_index = {}
+        for index in self.room_order.tolist():
+            room = self.build_room(self.room_records[index])
+            game_map._add_room_to_maps_and_list(room, room.x, room.y)
+            game_map._manage_room_clusters(room, room.cluster_id)
+        for record in self.entity_records:
+            kind = int(record["kind"])
+            if kind == PLAYER:
+                continue
+            room = game_map.room_dict.get((int(record["room"]) % self.grid_width, int(record["room"]) // self.grid_width)) if record["owner"] == IN_ROOM else None
+            flags = int(record["flags"])
+            if kind in (ENEMY, ALLY):
+                placeable = self.build_character(record, Character)
+                if flags & PLAYER_ALLY:
+                    player.ally = placeable
+            else:
+                placeable = self.build_item(record)
+            if room is not None:
+                placeable.current_room = room
+                if kind in ROOM_ATTRIBUTES:
+                    setattr(room, ROOM_ATTRIBUTES[kind], placeable)
+                else:
+                    room.add_item(placeable)
+            else:
+                player.inventory.append(placeable)
+                if flags & EQUIPPED_WEAPON:
+                    player.weapon = placeable
+                if flags & EQUIPPED_ARMOR:
+                    player.armor = placeable
+                if flags & PLAYER_KEY:
+                    player.key = placeable
+        if self.player_start_index >= 0:
+            game_map.set_player_start_room(game_map.room_dict[(self.player_start_index % self.grid_width, self.player_start_index // self.grid_width)])
+        if player_room_index >= 0:
+            player.current_room = game_map.room_dict[(player_room_index % self.grid_width, player_room_index // self.grid_width)]
+            player.x, player.y = player.current_room.x, player.current_room.y
+        return game_map, player
@@ -0,0 +1,56 @@
+import numpy as np
+
+STAT_COLUMNS = {
+    "characters": ("hp", "atk", "defp", "acc", "ev"),
+    "weapons": ("damage", "accuracy"),
+    "armor": ("defp", "ev"),
+    "healing": ("hp",),
+}
+# per-level growth rolled by Character.__init__, as inclusive (low, high) randint bounds per character column
+LEVEL_ROLLS = {"hp": (2, 12), "atk": (1, 3), "defp": (1, 2), "acc": (1, 2), "ev": (1, 2)}
+
+class StatTable:
+    def __init__(self, templates, columns):
+        self.names = tuple(template["type"] for template in templates)
+        self.columns = columns
+        self.column_index = {column: i for i, column in enumerate(columns)}
+        self.values = np.array([[template["stats"][column] for column in columns] for template in templates], dtype=np.int32).reshape(len(templates), len(columns))
+
+    def __len__(self):
+        return len(self.names)
+
+    def column(self, name):
+        return self.values[:, self.column_index[name]]
+
+    def row(self, index):
+        return self.values[index].tolist()
+
+    def sample(self, np_rng, size):
+        return np_rng.integers(0, len(self.names), size=size)
+
+    def scaled(self, indices, factors):
+        # factors broadcast against the selected rows: a scalar, one per row, or one per column
+        return np.rint(self.values[indices] * np.asarray(factors, dtype=float)).astype(np.int32)
+
+class GenreStats:
+    def __init__(self, genre):
+        self.genre_name = genre["genre"]
+        elements = genre["elements"]
+        self.tables = {kind: StatTable(elements.get(kind, []), columns) for kind, columns in STAT_COLUMNS.items()}
+        self.characters = self.tables["characters"]
+        self.weapons = self.tables["weapons"]
+        self.armor = self.tables["armor"]
+        self.healing = self.tables["healing"]
+
+    def character_stats(self, indices, levels, np_rng):
+        # the same per-level randint growth Character.__init__ rolls, for a whole batch in one draw per column
+        return self.characters.values[np.asarray(indices)].astype(np.int64) + level_growth(levels, np_rng)
+
+def level_growth(levels, np_rng):
+    levels = np.asarray(levels)
+    depth = int(levels.max()) if len(levels) else 0
+    below_level = np.arange(depth) < levels[:, None]
+    growth = np.zeros((len(levels), len(LEVEL_ROLLS)), dtype=np.int64)
+    for i, (low, high) in enumerate(LEVEL_ROLLS.values()):
+        growth[:, i] = (np_rng.integers(low, high + 1, size=(len(levels), depth)) * below_level).sum(axis=1)
+    return growth
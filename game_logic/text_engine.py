@@ -0,0 +1,88 @@
+from math import gcd
+import numpy as np
+import random
+
+DESCRIPTORS = {
+    5: ("Elite", "Battle-Hardened", "Steely", "Hardened", "Ruthless", "Dauntless"),
+    4: ("Seasoned", "Practiced", "Adept", "Wise", "Veteran", "Proficient"),
+    3: ("Challenging", "Full-grown", "Trained", "Tricky"),
+    2: ("Tough", "Experienced", "Solid", "Rugged", "Stout", "Strong"),
+    1: ("Wily", "Cunning", "Spirited", "Fiery", "Energetic", "Ambitious"),
+    0: ("Normal", "Average", "Standard", "Regular", "Usual"),
+    -1: ("Hesitant", "Unprepared", "Immature", "Bruised", "Sick-looking"),
+    -2: ("Innocuous", "Harmless", "Old", "Scowling", "Unfortunate"),
+    -3: ("Inexperienced", "Novice", "Beginner", "Rookie"),
+    -4: ("Weak", "Fragile", "Frail", "Feeble", "Tottering", "Sickly"),
+    -5: ("Helpless", "Uninteresting", "Inept", "Ineffectual", "Sad", "Lame"),
+}
+FRIENDLY_SYNONYMS = ("friendly", "ally", "peaceful", "relaxed", "polite", "smiling")
+HOSTILE_SYNONYMS = ("hostile", "enemy", "angry", "violent", "rude", "crazed")
+ROOM_FIELDS = ("adjectives", "name", "scenery", "atmosphere")
+TITLED_FIELDS = ("adjectives", "name")
+
+def clamp_level_difference(level_difference):
+    return max(-5, min(5, level_difference))
+
+def decorated_name(base_name, is_hostile, level_difference, rng=None):
+    rng = rng or random
+    descriptors = DESCRIPTORS.get(clamp_level_difference(level_difference))
+    descriptor = rng.choice(descriptors) if descriptors else "Unknown"
+    type_desc = rng.choice(HOSTILE_SYNONYMS if is_hostile else FRIENDLY_SYNONYMS)
+    return f"{descriptor} {base_name} ({type_desc})"
+
+class TextTable:
+    def __init__(self, fragments):
+        self.fragments = tuple(fragments)
+        size = len(self.fragments)
+        # any stride coprime with the table size walks every fragment once before repeating, like a shuffled cycle
+        self.strides = tuple(stride for stride in range(1, size) if gcd(stride, size) == 1) or (1,)
+
+    def walk(self, rng, count):
+        size = len(self.fragments)
+        start = rng.randrange(size)
+        stride = rng.choice(self.strides)
+        return ((start + stride * np.arange(count, dtype=np.int64)) % size).tolist()
+
+def room_fragments(rooms_data):
+    # the text a genre's rooms contribute, one tuple per field; equal content gives an equal key
+    fragments = []
+    for field in ROOM_FIELDS:
+        items = [item for data in rooms_data for item in data[field]]
+        if field in TITLED_FIELDS:
+            items = [item.title() for item in items]
+        fragments.append(tuple(items))
+    return tuple(fragments)
+
+class TextEngine:
+    def __init__(self, rooms_data, fragments=None):
+        fragments = fragments or room_fragments(rooms_data)
+        self.tables = {field: TextTable(items) for field, items in zip(ROOM_FIELDS, fragments)}
+
+    def room_texts(self, rng, count):
+        # name and description fragment tuples for a whole map, drawn in one pass
+        adjectives, names, scenery, atmosphere = (self.tables[field] for field in ROOM_FIELDS)
+        return [((adjectives.fragments[a], names.fragments[n]), (scenery.fragments[s], atmosphere.fragments[t]))
+                for a, n, s, t in zip(adjectives.walk(rng, count), names.walk(rng, count), scenery.walk(rng, count), atmosphere.walk(rng, count))]
+
+    def decorated_names(self, base_names, hostile, level_differences, np_rng):
+        # bulk decorated_name: one draw per column instead of two rng.choice calls per character
+        level_differences = np.clip(np.asarray(level_differences), -5, 5).tolist()
+        descriptor_picks = np_rng.random(len(base_names)).tolist()
+        synonym_picks = np_rng.integers(0, len(HOSTILE_SYNONYMS), size=len(base_names)).tolist()
+        names = []
+        for base_name, is_hostile, level_difference, descriptor_pick, synonym_pick in zip(base_names, hostile, level_differences, descriptor_picks, synonym_picks):
+            descriptors = DESCRIPTORS[level_difference]
+            synonyms = HOSTILE_SYNONYMS if is_hostile else FRIENDLY_SYNONYMS
+            names.append(f"{descriptors[int(descriptor_pick * len(descriptors))]} {base_name} ({synonyms[synonym_pick]})")
+        return names
+
+compiled_engines = {}
+
+def compile_text_engine(rooms_data, genre_name=None):
+    # compiled once per genre, so a hit is a dictionary lookup; without a genre name the room text itself is the key
+    key = genre_name if genre_name is not None else room_fragments(rooms_data)
+    engine = compiled_engines.get(key)
+    if engine is None:
+        engine = TextEngine(rooms_data)
+        compiled_engines[key] = engine
+    return engine
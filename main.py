@@ -3,6 +3,7 @@ from game_logic.game_gui import GameGUI
 import logging
 import os
 from PySide6.QtWidgets import QApplication
+import multiprocessing
 import sys
 
 def resource_path(relative_path):
@@ -10,11 +11,14 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     app = QApplication([])
     logging.basicConfig(filename='my_errors.log', 
                     level=logging.DEBUG, 
                     filemode='w')
     json_file_path = resource_path("./data/data.json")
     game_init = DataLoader(json_file_path)
+    game_init.start_map_pool()
     game_gui = GameGUI(data_loader=game_init)
-    app.exec()
\ No newline at end of file
+    app.exec()
+    game_init.stop_map_pool()
\ No newline at end of file
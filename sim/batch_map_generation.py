@@ -0,0 +1,82 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from game_logic.data_loader import DataLoader
+import argparse
+import contextlib
+import io
+import numpy as np
+import os
+import time
+
+data_loader = None
+
+def resource_path(relative_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+def init_worker(json_path):
+    # one DataLoader per worker process, so data.json is parsed once rather than per map
+    global data_loader
+    data_loader = DataLoader(json_path)
+
+def generate_one(genre_name, seed, grid_width, grid_height):
+    data_loader.select_genre(genre_name)
+    data_loader.generate_game_title()
+    failure = None
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            game_map = data_loader.create_game_map(grid_width, grid_height, seed=seed)
+        if not game_map:
+            failure = "retries exhausted"
+    except Exception as e:
+        failure = f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - start
+    return genre_name, seed, elapsed, data_loader.generation_attempts, failure
+
+def run_batch(json_path, genre_names, maps_per_genre, grid_width, grid_height, seed_start, workers):
+    jobs = [(genre_name, seed_start + i) for genre_name in genre_names for i in range(maps_per_genre)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(json_path,)) as pool:
+        futures = [pool.submit(generate_one, genre_name, seed, grid_width, grid_height) for genre_name, seed in jobs]
+        results = [future.result() for future in futures]
+    wall_time = time.perf_counter() - start
+    return results, wall_time
+
+def summarize(results, wall_time):
+    latencies = np.array([elapsed for _, _, elapsed, _, _ in results])
+    successes = [result for result in results if result[4] is None]
+    retry_histogram = Counter(attempts for _, _, _, attempts, failure in results if failure is None)
+    failure_causes = Counter(failure for _, _, _, _, failure in results if failure is not None)
+    print(f"Maps generated: {len(successes)}/{len(results)} in {wall_time:.2f}s ({len(successes) / wall_time:.2f} maps/sec)")
+    print(f"Latency p50: {np.percentile(latencies, 50) * 1000:.1f}ms, p99: {np.percentile(latencies, 99) * 1000:.1f}ms, max: {latencies.max() * 1000:.1f}ms")
+    print("Attempts needed per successful map:")
+    for attempts, count in sorted(retry_histogram.items()):
+        print(f"  {attempts}: {count}")
+    if failure_causes:
+        print("Failure causes:")
+        for cause, count in failure_causes.most_common():
+            print(f"  {count} x {cause}")
+    print("Per genre:")
+    for genre_name in sorted(set(result[0] for result in results)):
+        genre_latencies = [elapsed for genre, _, elapsed, _, _ in results if genre == genre_name]
+        genre_failures = sum(1 for genre, _, _, _, failure in results if genre == genre_name and failure is not None)
+        print(f"  {genre_name}: p50 {np.percentile(genre_latencies, 50) * 1000:.1f}ms, {genre_failures} failed")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate game maps headlessly and report throughput and retry statistics.")
+    parser.add_argument("-n", "--maps-per-genre", type=int, default=20)
+    parser.add_argument("--width", type=int, default=9)
+    parser.add_argument("--height", type=int, default=9)
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--genre", action="append", help="restrict to a genre; may be given more than once")
+    parser.add_argument("--data", default=resource_path("data/data.json"))
+    args = parser.parse_args()
+    genre_names = args.genre or DataLoader(args.data).genre_names()
+    results, wall_time = run_batch(args.data, genre_names, args.maps_per_genre, args.width, args.height, args.seed_start, args.workers)
+    summarize(results, wall_time)
+
+if __name__ == "__main__":
+    # usage: python -m sim.batch_map_generation -n 50 --width 32 --height 32
+    main()
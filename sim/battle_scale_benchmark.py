@@ -0,0 +1,38 @@
+from game_logic.battle_scheduler import BattleScheduler
+from game_logic.combat_engine import ATTACK, CombatEngine
+from game_logic.data_loader import DataLoader
+from game_logic.game_objects import Character, Player
+import os
+import random
+import sys
+import time
+
+def resource_path(relative_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+def army(stats, rng, size, is_enemy):
+    rows = [rng.randrange(len(stats.characters)) for _ in range(size)]
+    return [Character(stats.characters.names[row], 1, *stats.characters.row(row), 0, 0, is_enemy, rng=rng) for row in rows]
+
+def main(largest=1000, rounds=3, seed=0):
+    data_loader = DataLoader(resource_path("data/data.json"))
+    data_loader.select_genre(data_loader.genre_names()[0])
+    stats = data_loader.stat_tables()
+    size = 1
+    while size <= largest:
+        for engine_class in (CombatEngine, BattleScheduler):
+            rng = random.Random(seed)
+            engine = engine_class(Player(), army(stats, rng, size - 1, False), army(stats, rng, size, True), rng=rng)
+            engine.roll_initiative()
+            actions = 0
+            start = time.perf_counter()
+            for _ in range(rounds):
+                actions += sum(event.kind == ATTACK for event in engine.resolve_round())
+            elapsed = time.perf_counter() - start
+            print(f"{size:>5} per side  {engine_class.__name__:<16} {actions:>6} actions  {elapsed / max(actions, 1) * 1e6:6.1f}us/action")
+        size *= 10
+
+if __name__ == "__main__":
+    # usage: python -m sim.battle_scale_benchmark [LARGEST_SIDE] [ROUNDS]
+    main(*(int(arg) for arg in sys.argv[1:3]))
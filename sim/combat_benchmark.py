@@ -0,0 +1,39 @@
+from collections import Counter
+from game_logic.combat_engine import CombatEngine
+from game_logic.combat_recorder import CombatRecorder
+from game_logic.data_loader import DataLoader
+from game_logic.game_objects import Character, Player
+import copy
+import os
+import random
+import sys
+import time
+
+def resource_path(relative_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+def main(fights=5000, record=0, seed=0):
+    data_loader = DataLoader(resource_path("data/data.json"))
+    data_loader.select_genre(data_loader.genre_names()[0])
+    stats = data_loader.stat_tables()
+    rng = random.Random(seed)
+    player_template = Player()
+    outcomes = Counter()
+    rounds = 0
+    start = time.perf_counter()
+    for _ in range(fights):
+        row = rng.randrange(len(stats.characters))
+        enemy = Character(stats.characters.names[row], 1, *stats.characters.row(row), 0, 0, True, rng=rng)
+        engine = CombatEngine(copy.copy(player_template), [], [enemy], rng=rng)
+        events = engine.run()
+        if record:
+            CombatRecorder().record_all(events)
+        outcomes["won" if engine.player_won else "lost"] += 1
+        rounds += engine.rounds
+    elapsed = time.perf_counter() - start
+    print(f"{fights} fights in {elapsed:.2f}s ({fights / elapsed:.0f} fights/s), {rounds / fights:.1f} rounds on average, {dict(outcomes)}")
+
+if __name__ == "__main__":
+    # usage: python -m sim.combat_benchmark [FIGHTS] [RECORD]
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,11 @@
+from game_logic.combat_recorder import RecordedFight
+import sys
+
+def main(path="last_combat.bin"):
+    fight = RecordedFight.load(path)
+    print(f"{len(fight.roster)} combatants: " + ", ".join(f"{combatant.name} (HP {combatant.hp})" for combatant in fight.roster))
+    print(fight.to_text())
+
+if __name__ == "__main__":
+    # usage: python -m sim.combat_log_export [RECORDING]
+    main(*sys.argv[1:2])
@@ -0,0 +1,53 @@
+from game_logic.combat_simulator import CombatSimulator, STATS
+from game_logic.data_loader import DataLoader
+from game_logic.stat_tables import level_growth
+import argparse
+import numpy as np
+import os
+import time
+
+# Player.__init__'s base stats before level growth
+PLAYER_BASE = np.array([100, 10, 10, 45, 35])
+
+def resource_path(relative_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+def as_stats(matrix):
+    return {stat: matrix[:, i] for i, stat in enumerate(STATS)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo win rates of a fresh player against every character template of a genre.")
+    parser.add_argument("--data", default=resource_path("data/data.json"))
+    parser.add_argument("--genre", help="genre name; defaults to every genre")
+    parser.add_argument("--player-level", type=int, default=1)
+    parser.add_argument("--enemy-levels", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--fights", type=int, default=20000, help="fights per matchup")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    data_loader = DataLoader(args.data)
+    rng = np.random.default_rng(args.seed)
+    simulator = CombatSimulator(rng)
+    total_fights = 0
+    start = time.perf_counter()
+    for genre_name in [args.genre] if args.genre else data_loader.genre_names():
+        data_loader.select_genre(genre_name)
+        stats = data_loader.stat_tables()
+        print(f"{genre_name}: player level {args.player_level} win rate by enemy level {args.enemy_levels}")
+        for row, name in enumerate(stats.characters.names):
+            cells = []
+            for enemy_level in args.enemy_levels:
+                player = PLAYER_BASE + level_growth(np.full(args.fights, args.player_level), rng)
+                enemy = stats.character_stats(np.full(args.fights, row), np.full(args.fights, enemy_level), rng)
+                result = simulator.simulate(as_stats(player), as_stats(enemy))
+                total_fights += args.fights
+                winners = result.attacker_hp[result.attacker_won]
+                hp_left = np.median(winners) if len(winners) else 0
+                cells.append(f"{result.win_rate:6.1%} ({np.median(result.rounds):3.0f} rds, {hp_left:4.0f} hp)")
+            print(f"  {name:>28}: " + "  ".join(cells))
+    elapsed = time.perf_counter() - start
+    print(f"{total_fights} fights in {elapsed:.1f}s ({total_fights / elapsed:.0f} fights/s)")
+
+if __name__ == "__main__":
+    # usage: python -m sim.combat_monte_carlo [--genre Fantasy] [--fights 20000]
+    main()
@@ -0,0 +1,67 @@
+from collections import defaultdict
+from game_logic.data_loader import DataLoader
+import contextlib
+import io
+import os
+import timeit
+
+class LegacyRoom:
+    # the connected_rooms defaultdict representation Room used before the connection bitmask
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.connected_rooms = defaultdict(lambda: None, {"north": None, "south": None, "east": None, "west": None})
+
+    def count_connections(self):
+        return len([direction for direction, connected_room in self.connected_rooms.items() if connected_room is not None])
+
+    def available_connections(self):
+        possible_directions = ["north", "south", "east", "west"]
+        return [direction for direction in possible_directions if self.connected_rooms[direction] is None]
+
+def legacy_is_connected(room1, room2):
+    return room2 in room1.connected_rooms.values() and room1 in room2.connected_rooms.values()
+
+def legacy_can_connect_rooms(room1, room2, max_connections=4):
+    return (not legacy_is_connected(room1, room2)
+            and room1.count_connections() < max_connections
+            and room2.count_connections() < max_connections
+            and abs(room1.x - room2.x) + abs(room1.y - room2.y) == 1)
+
+def resource_path(relative_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+def build_maps(grid_size):
+    data_loader = DataLoader(resource_path("data/data.json"))
+    data_loader.select_random_genre()
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_map = data_loader.create_game_map(grid_size, grid_size, seed=0)
+    legacy_rooms = {(room.x, room.y): LegacyRoom(room.x, room.y) for room in game_map.rooms}
+    for room in game_map.rooms:
+        for direction, other in room.connected_rooms.items():
+            if other is not None:
+                legacy_rooms[(room.x, room.y)].connected_rooms[direction] = legacy_rooms[(other.x, other.y)]
+    return game_map, legacy_rooms
+
+def main(grid_size=64, repeat=5):
+    game_map, legacy_rooms = build_maps(grid_size)
+    rooms = game_map.rooms
+    legacy = [legacy_rooms[(room.x, room.y)] for room in rooms]
+    pairs = [(room, game_map.room_dict[(room.x + 1, room.y)]) for room in rooms if (room.x + 1, room.y) in game_map.room_dict]
+    legacy_pairs = [(legacy_rooms[(a.x, a.y)], legacy_rooms[(b.x, b.y)]) for a, b in pairs]
+    cases = [
+        ("count_connections", lambda: [room.count_connections() for room in legacy], lambda: [room.count_connections() for room in rooms]),
+        ("available_connections", lambda: [room.available_connections() for room in legacy], lambda: [room.available_connections() for room in rooms]),
+        ("is_connected", lambda: [legacy_is_connected(a, b) for a, b in legacy_pairs], lambda: [game_map.is_connected(a, b) for a, b in pairs]),
+        ("can_connect_rooms", lambda: [legacy_can_connect_rooms(a, b) for a, b in legacy_pairs], lambda: [game_map.can_connect_rooms(a, b) for a, b in pairs]),
+    ]
+    print(f"{grid_size}x{grid_size} map, {len(rooms)} rooms, {len(pairs)} neighbour pairs")
+    for name, legacy_call, bitmask_call in cases:
+        legacy_time = min(timeit.repeat(legacy_call, number=1, repeat=repeat))
+        bitmask_time = min(timeit.repeat(bitmask_call, number=1, repeat=repeat))
+        print(f"{name:>22}: dict {legacy_time * 1000:.2f}ms, bitmask {bitmask_time * 1000:.2f}ms, {legacy_time / bitmask_time:.1f}x")
+
+if __name__ == "__main__":
+    # usage: python -m sim.connectivity_benchmark
+    main()
@@ -0,0 +1,44 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+LOADER_SETUP = "from game_logic.data_loader import DataLoader"
+LOADER_BODY = "loader = DataLoader(path)\nloader.select_random_genre()"
+SCENARIOS = {
+    # the loader before the genre cache: parse the whole file, then use one genre
+    "json.load": ("import json, random", "with open(path) as file:\n    data = json.load(file)\ngenre = random.choice(data['genres'])"),
+    # cold start parses the JSON and writes the cache; warm start maps the cache and decodes one shard
+    "cold (build cache)": (LOADER_SETUP, LOADER_BODY),
+    "warm (cached)": (LOADER_SETUP, LOADER_BODY),
+}
+TIMER = "{setup}\nimport time\nstart = time.perf_counter()\n{body}\nprint(time.perf_counter() - start)"
+
+def resource_path(relative_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+def run_once(path, setup, body):
+    # a fresh interpreter per run, so every timing is a real process start with nothing decoded yet
+    code = f"path = {path!r}\n" + TIMER.format(setup=setup, body=body)
+    result = subprocess.run([sys.executable, "-c", code], cwd=resource_path("."), capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main(runs=5):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "data.json")
+        shutil.copy(resource_path("data/data.json"), path)
+        cache_path = f"{path}.cache"
+        for name, (setup, body) in SCENARIOS.items():
+            timings = []
+            for _ in range(runs):
+                if name != "warm (cached)" and os.path.exists(cache_path):
+                    os.remove(cache_path)
+                timings.append(run_once(path, setup, body))
+            print(f"{name:>20}: best {min(timings) * 1000:.2f}ms, mean {sum(timings) / len(timings) * 1000:.2f}ms")
+        print(f"source {os.path.getsize(path)} bytes, cache {os.path.getsize(cache_path)} bytes")
+
+if __name__ == "__main__":
+    # usage: python -m sim.data_load_benchmark
+    main()
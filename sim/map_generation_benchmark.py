@@ -0,0 +1,47 @@
+from game_logic.data_loader import DataLoader
+import contextlib
+import io
+import os
+import sys
+import time
+
+GRID_SIZES = [(9, 9), (64, 64), (256, 256)]
+
+def resource_path(relative_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+def time_generation(data_loader, grid_width, grid_height, runs):
+    timings = []
+    profiles = []
+    for _ in range(runs):
+        data_loader.select_random_genre()
+        data_loader.generate_game_title()
+        start = time.perf_counter()
+        # generate_game_map prints every placeable; keep the benchmark output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            game_map = data_loader.create_game_map(grid_width, grid_height)
+        timings.append(time.perf_counter() - start)
+        if not game_map:
+            print(f"{grid_width}x{grid_height}: generation failed")
+        else:
+            profiles.append(game_map.profile)
+    return timings, profiles
+
+def main(sizes=GRID_SIZES, runs=3):
+    data_loader = DataLoader(resource_path("data/data.json"))
+    for grid_width, grid_height in sizes:
+        timings, profiles = time_generation(data_loader, grid_width, grid_height, runs)
+        rooms = grid_width * grid_height
+        best = min(timings)
+        print(f"{grid_width}x{grid_height} ({rooms} rooms): best {best:.4f}s, "
+              f"mean {sum(timings) / len(timings):.4f}s, {rooms / best:.0f} rooms/s")
+        if profiles:
+            print(min(profiles, key=lambda profile: profile.seconds).summary())
+
+if __name__ == "__main__":
+    # usage: python -m sim.map_generation_benchmark [WIDTHxHEIGHT ...]
+    if len(sys.argv) > 1:
+        main([tuple(int(n) for n in arg.split("x")) for arg in sys.argv[1:]])
+    else:
+        main()
@@ -0,0 +1,66 @@
+from game_logic.data_loader import DataLoader
+from game_logic.game_objects import Player, Weapon
+from game_logic.save_format import SaveFile
+import contextlib
+import io
+import os
+import pickle
+import tempfile
+import time
+
+def resource_path(relative_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+def room_signature(room):
+    placeables = [getattr(room, attribute) for attribute in ("key_item", "lock_item", "weapon", "armor", "enemy", "ally")]
+    return (room.x, room.y, room.type, room.name, room.description, room.cluster_id, room.connections, room.max_connections,
+            [character_signature(placeable) if hasattr(placeable, "hp") and hasattr(placeable, "level") else getattr(placeable, "name", None)
+             for placeable in placeables],
+            [item.name for item in room.items])
+
+def character_signature(character):
+    return (character.name, character.level, character.hp, character.atk, character.defp, character.acc, character.ev,
+            character.weapon_tier, character.armor_tier, character.is_enemy, character.is_dead)
+
+def player_signature(player):
+    return (character_signature(player), player.xp, (player.current_room.x, player.current_room.y),
+            [item.name for item in player.inventory], getattr(player.weapon, "name", None), getattr(player.armor, "name", None))
+
+def main(grid_sizes=(9, 64)):
+    data_loader = DataLoader(resource_path("data/data.json"))
+    with tempfile.TemporaryDirectory() as directory:
+        for genre_name in data_loader.genre_names():
+            for grid_size in grid_sizes:
+                data_loader.select_genre(genre_name)
+                player = Player()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    game_map = data_loader.create_game_map(grid_size, grid_size, player=player, seed=grid_size)
+                player.current_room = game_map.rooms[-1]
+                weapon = Weapon("Test Blade", 5, 3)
+                player.inventory.append(weapon)
+                player.weapon = weapon
+                player.xp = 42.5
+                path = os.path.join(directory, f"{genre_name}-{grid_size}.sav")
+                data_loader.save_game(path, player)
+                pickled = len(pickle.dumps(game_map, protocol=pickle.HIGHEST_PROTOCOL))
+                start = time.perf_counter()
+                with SaveFile(path) as save_file:
+                    probe = save_file.room_at(game_map.rooms[0].x, game_map.rooms[0].y)
+                    assert probe.name == game_map.rooms[0].name
+                open_time = time.perf_counter() - start
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    loaded_map, loaded_player = data_loader.load_game(path)
+                load_time = time.perf_counter() - start
+                assert [room_signature(room) for room in loaded_map.rooms] == [room_signature(room) for room in game_map.rooms]
+                assert (loaded_map.player_start_room.x, loaded_map.player_start_room.y) == (game_map.player_start_room.x, game_map.player_start_room.y)
+                assert player_signature(loaded_player) == player_signature(player)
+                assert all(room.room_grid is loaded_map.room_dict for room in loaded_map.rooms)
+                print(f"{genre_name:>20} {grid_size}x{grid_size}: {os.path.getsize(path)} bytes (pickle {pickled}), "
+                      f"open+probe {open_time * 1000:.2f}ms, full load {load_time * 1000:.1f}ms")
+    print("Round trip OK")
+
+if __name__ == "__main__":
+    # usage: python -m sim.save_roundtrip
+    main()
@@ -0,0 +1,36 @@
+from game_logic.data_loader import DataLoader
+import contextlib
+import gc
+import io
+import os
+import sys
+import tracemalloc
+
+def resource_path(relative_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+def measure_session(data_loader, grid_width, grid_height, seed):
+    # a session's resident footprint: the generated map with its rooms, items and characters
+    gc.collect()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        game_map = data_loader.create_game_map(grid_width, grid_height, seed=seed)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return game_map, current, peak
+
+def main(grid_size=64, sessions=3):
+    data_loader = DataLoader(resource_path("data/data.json"))
+    data_loader.select_genre("Fantasy")
+    total = 0
+    for seed in range(sessions):
+        game_map, current, peak = measure_session(data_loader, grid_size, grid_size, seed)
+        total += current
+        print(f"session {seed}: {len(game_map.rooms)} rooms, {current / 1024:.0f} KiB resident, {current / len(game_map.rooms):.0f} B/room, peak {peak / 1024:.0f} KiB")
+    print(f"mean per session: {total / sessions / 1024:.0f} KiB")
+
+if __name__ == "__main__":
+    # usage: python -m sim.session_memory [GRID_SIZE]
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 64)
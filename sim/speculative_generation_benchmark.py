@@ -0,0 +1,39 @@
+from game_logic.data_loader import DataLoader
+import contextlib
+import io
+import numpy as np
+import os
+import sys
+import time
+
+def resource_path(relative_path):
+    base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+def latencies(create, data_loader, maps):
+    timings = []
+    for seed in range(maps):
+        data_loader.select_genre(data_loader.genre_names()[seed % len(data_loader.genre_names())])
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            game_map = create(seed)
+        timings.append(time.perf_counter() - start)
+        if not game_map:
+            print(f"seed {seed}: no map")
+    return np.array(timings)
+
+def report(name, timings):
+    print(f"{name:>24}: p50 {np.percentile(timings, 50) * 1000:.1f}ms, p99 {np.percentile(timings, 99) * 1000:.1f}ms, max {timings.max() * 1000:.1f}ms")
+
+def main(grid_size=32, maps=40, attempts=4):
+    data_loader = DataLoader(resource_path("data/data.json"))
+    print(f"{maps} maps of {grid_size}x{grid_size}, racing {attempts} seeds")
+    report("serial retries", latencies(lambda seed: data_loader.create_game_map(grid_size, grid_size, seed=seed), data_loader, maps))
+    # the first race pays for spawning the workers; warm them before timing
+    data_loader.create_game_map_speculative(grid_size, grid_size, attempts=attempts, seed=0)
+    report("speculative race", latencies(lambda seed: data_loader.create_game_map_speculative(grid_size, grid_size, attempts=attempts, seed=seed), data_loader, maps))
+    data_loader.stop_speculative_generation()
+
+if __name__ == "__main__":
+    # usage: python -m sim.speculative_generation_benchmark [GRID_SIZE]
+    main(*(int(arg) for arg in sys.argv[1:2]))